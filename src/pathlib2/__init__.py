@@ -12,9 +12,14 @@ import os
 import posixpath
 import re
 import sys
+import threading
 import warnings
-from _collections_abc import Sequence
+import weakref
+from _collections_abc import Sequence, MutableSet
+from array import array
+from collections import OrderedDict, deque, namedtuple
 from errno import ENOENT, ENOTDIR, EBADF, ELOOP
+from itertools import islice
 from operator import attrgetter
 from stat import S_ISDIR, S_ISLNK, S_ISREG, S_ISSOCK, S_ISBLK, S_ISCHR, S_ISFIFO
 from urllib.parse import quote_from_bytes as urlquote_from_bytes
@@ -23,6 +28,9 @@ from urllib.parse import quote_from_bytes as urlquote_from_bytes
 __all__ = [
     "PurePath", "PurePosixPath", "PureWindowsPath",
     "Path", "PosixPath", "WindowsPath",
+    "PathPool", "PathArray", "PathTrie", "PathPattern",
+    "PatternSet",
+    "parse_cache_info", "parse_cache_clear", "set_parse_cache_size",
     ]
 
 #
@@ -52,6 +60,202 @@ def _is_wildcard_pattern(pat):
     return "*" in pat or "?" in pat or "[" in pat
 
 
+def _brace_groups(pat):
+    # Return a mapping from the positions of the braces and commas of the
+    # groups of alternatives such as '{a,b}' in this pattern to the regular
+    # expression syntax they stand for.  Braces not enclosing a comma, or
+    # not closed, and those within brackets are taken literally.
+    marks = {}
+    groups = []
+    i = 0
+    while i < len(pat):
+        c = pat[i]
+        if c == '[':
+            # Skip a set of characters, like fnmatch.translate() does.
+            j = _set_end(pat, i + 1)
+            if j >= 0:
+                i = j
+        elif c == '{':
+            groups.append((i, []))
+        elif c == ',' and groups:
+            groups[-1][1].append(i)
+        elif c == '}' and groups:
+            start, commas = groups.pop()
+            if commas:
+                marks[start] = '(?:'
+                for j in commas:
+                    marks[j] = '|'
+                marks[i] = ')'
+        i += 1
+    return marks
+
+
+def _set_end(pat, i):
+    # Return the position of the ']' closing a set whose contents start at
+    # position *i*, or -1 if there is none.
+    if i < len(pat) and pat[i] == '!':
+        i += 1
+    if i < len(pat) and pat[i] == ']':
+        i += 1
+    return pat.find(']', i)
+
+
+def _translate_set(stuff, guard=''):
+    # Translate the inside of a '[...]' set the way fnmatch.translate()
+    # does: empty or reversed ranges are dropped, and backslashes, stray
+    # hyphens and characters starting nested sets or set operations are
+    # escaped.  *guard* is put before the set, to keep it from matching
+    # some characters.
+    if '-' not in stuff:
+        stuff = stuff.replace('\\', '\\\\')
+    else:
+        chunks = []
+        i = 0
+        k = 2 if stuff[0] == '!' else 1
+        while True:
+            k = stuff.find('-', k)
+            if k < 0:
+                break
+            chunks.append(stuff[i:k])
+            i = k + 1
+            k = k + 3
+        chunk = stuff[i:]
+        if chunk:
+            chunks.append(chunk)
+        else:
+            chunks[-1] += '-'
+        # Remove empty ranges, which are invalid in regular expressions.
+        for k in range(len(chunks) - 1, 0, -1):
+            if chunks[k - 1][-1] > chunks[k][0]:
+                chunks[k - 1] = chunks[k - 1][:-1] + chunks[k][1:]
+                del chunks[k]
+        # Hyphens that create ranges are kept as they are.
+        stuff = '-'.join(s.replace('\\', '\\\\').replace('-', '\\-')
+                         for s in chunks)
+    stuff = re.sub(r'([&~|[])', r'\\\1', stuff)
+    if not stuff:
+        # Empty range: never match.
+        return '(?!)'
+    if stuff == '!':
+        # Negated empty range: match any character.
+        return guard + '.'
+    if stuff[0] == '!':
+        stuff = '^' + stuff[1:]
+    elif stuff[0] == '^':
+        stuff = '\\' + stuff
+    return '%s[%s]' % (guard, stuff)
+
+
+def _translate(pat, braces=False):
+    # Translate a pattern into a regular expression, with '{a,b}'
+    # alternatives if *braces* is true.  Each group of alternatives becomes
+    # a group of the expression, rather than every combination of them
+    # being listed.
+    marks = _brace_groups(pat) if braces and '{' in pat else None
+    if not marks:
+        return fnmatch.translate(pat)
+    res = []
+    i = 0
+    while i < len(pat):
+        c = pat[i]
+        if i in marks:
+            res.append(marks[i])
+        elif c == '*':
+            # Compress consecutive '*' into one.
+            if not res or res[-1] != '.*':
+                res.append('.*')
+        elif c == '?':
+            res.append('.')
+        elif c == '[':
+            j = _set_end(pat, i + 1)
+            if j < 0:
+                res.append('\\[')
+            else:
+                res.append(_translate_set(pat[i + 1:j]))
+                i = j
+        else:
+            res.append(re.escape(c))
+        i += 1
+    return '(?s:%s)\\Z' % ''.join(res)
+
+
+_CacheInfo = namedtuple("_CacheInfo",
+                        ["hits", "misses", "maxsize", "currsize"])
+
+
+class _LRUCache(object):
+    """A thread-safe mapping holding at most *maxsize* entries, discarding
+    the least recently used one when full.  A maxsize of 0 disables it."""
+
+    def __init__(self, maxsize=0):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            if not self.maxsize:
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def resize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative, not %r" % (maxsize,))
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def info(self):
+        with self._lock:
+            return _CacheInfo(self.hits, self.misses, self.maxsize,
+                              len(self._data))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+# Maps (flavour, string) to the (drv, root, parts) result of parsing the
+# string.  Disabled by default; see set_parse_cache_size().
+_parse_cache = _LRUCache()
+
+
+def set_parse_cache_size(maxsize):
+    """Keep the parsed form of up to *maxsize* recently used path strings,
+    so that constructing paths from them again skips parsing.  A maxsize
+    of 0 (the default) disables the cache.
+    """
+    _parse_cache.resize(maxsize)
+
+
+def parse_cache_info():
+    """Return a named tuple (hits, misses, maxsize, currsize) describing
+    the state of the parse cache."""
+    return _parse_cache.info()
+
+
+def parse_cache_clear():
+    """Empty the parse cache and reset its statistics."""
+    _parse_cache.clear()
+
+
 if sys.version_info >= (3, 10):
     io_text_encoding = io.text_encoding
 else:
@@ -107,6 +311,30 @@ class _Flavour(object):
         parsed.reverse()
         return drv, root, parsed
 
+    def is_canonical(self, part):
+        """Whether the string *part* is spelled exactly like the string
+        representation of the path parsed from it, so that parsing can be
+        deferred until the parts are actually needed."""
+        sep = self.sep
+        altsep = self.altsep
+        if not part or altsep and altsep in part:
+            return False
+        drv, root, rel = self.splitroot(part)
+        if drv + root + rel != part:
+            # Redundant separators after the root, or a root added to an
+            # extended path.
+            return False
+        if not rel:
+            return True
+        if rel[:1] == sep:
+            # Redundant separators after the root of a UNC path.
+            return False
+        if rel == '.':
+            return not (drv or root)
+        return not (rel[-1] == sep or sep + sep in rel or
+                    rel[:2] == '.' + sep or rel[-2:] == sep + '.' or
+                    sep + '.' + sep in rel)
+
     def join_parsed_parts(self, drv, root, parts, drv2, root2, parts2):
         """
         Join the two paths represented by the respective
@@ -199,14 +427,20 @@ class _WindowsFlavour(_Flavour):
             part = part.lstrip(sep)
         return prefix + drv, root, part
 
+    def is_plain_name(self, part, sep=sep, altsep=altsep):
+        # Whether `part` parses to a single relative part equal to itself.
+        # Any colon is rejected rather than checking for a drive.
+        return (bool(part) and part != '.' and sep not in part and
+                altsep not in part and ':' not in part)
+
     def casefold(self, s):
         return s.lower()
 
     def casefold_parts(self, parts):
         return [p.lower() for p in parts]
 
-    def compile_pattern(self, pattern):
-        return re.compile(fnmatch.translate(pattern), re.IGNORECASE).fullmatch
+    def compile_pattern(self, pattern, braces=False):
+        return re.compile(_translate(pattern, braces), re.IGNORECASE).fullmatch
 
     def _split_extended_path(self, s, ext_prefix=ext_namespace_prefix):
         prefix = ''
@@ -267,14 +501,28 @@ class _PosixFlavour(_Flavour):
         else:
             return '', '', part
 
+    def is_canonical(self, part, sep=sep):
+        # Specialised version of _Flavour.is_canonical(), as this is on
+        # the hot path of constructing paths from strings.
+        if not part:
+            return False
+        if part[-1] == sep:
+            return part == sep or part == sep + sep
+        return (part.find(sep + sep, 1) == -1 and sep + '.' + sep not in part
+                and part[:2] != '.' + sep and part[-2:] != sep + '.')
+
+    def is_plain_name(self, part, sep=sep):
+        # Whether `part` parses to a single relative part equal to itself.
+        return bool(part) and part != '.' and sep not in part
+
     def casefold(self, s):
         return s
 
     def casefold_parts(self, parts):
         return parts
 
-    def compile_pattern(self, pattern):
-        return re.compile(fnmatch.translate(pattern)).fullmatch
+    def compile_pattern(self, pattern, braces=False):
+        return re.compile(_translate(pattern, braces)).fullmatch
 
     def is_reserved(self, parts):
         return False
@@ -302,139 +550,537 @@ else:
 # Globbing helpers
 #
 
+# Kinds of glob steps.  Every pattern of a selector is closed by an end
+# step.
+_LITERAL, _WILDCARD, _RECURSIVE, _END = range(4)
+
+# Number of directory entries matched at a time by streaming globs.
+_STREAM_BATCH_SIZE = 256
+
+
+def _compile_glob_steps(pattern_parts, flavour):
+    steps = []
+    for pat in pattern_parts:
+        if pat == '**':
+            steps.append((_RECURSIVE, None))
+        elif '**' in pat:
+            raise ValueError("Invalid pattern: '**' can only be an entire path component")
+        elif _is_wildcard_pattern(pat) or '{' in pat and _brace_groups(pat):
+            steps.append((_WILDCARD, flavour.compile_pattern(pat, True)))
+        elif steps and steps[-1][0] == _LITERAL:
+            # Runs of literal components are looked up at once.
+            steps[-1] = (_LITERAL, steps[-1][1] + (pat,))
+        else:
+            steps.append((_LITERAL, (pat,)))
+    return steps
+
+
 def _make_selector(pattern_parts, flavour):
-    pat = pattern_parts[0]
-    child_parts = pattern_parts[1:]
-    if pat == '**':
-        cls = _RecursiveWildcardSelector
-    elif '**' in pat:
-        raise ValueError("Invalid pattern: '**' can only be an entire path component")
-    elif _is_wildcard_pattern(pat):
-        cls = _WildcardSelector
-    else:
-        cls = _PreciseSelector
-    return cls(pat, child_parts, flavour)
+    return _Selector([_compile_glob_steps(pattern_parts, flavour)], flavour)
+
+
+def _make_multi_selector(patterns, flavour):
+    # *patterns* is a tuple of pattern parts tuples.
+    return _Selector([_compile_glob_steps(pattern_parts, flavour)
+                      for pattern_parts in patterns], flavour, multi=True)
 
 if hasattr(functools, "lru_cache"):
     _make_selector = functools.lru_cache()(_make_selector)
+    _make_multi_selector = functools.lru_cache()(_make_multi_selector)
+
+
+def _make_exclude(exclude, pathcls):
+    # Turn the exclude argument of globbing methods into a predicate.
+    if exclude is None or callable(exclude):
+        return exclude
+    if isinstance(exclude, str):
+        exclude = [exclude]
+    exclude = list(exclude)
+    flavour = pathcls._flavour
+    matchers = []
+    for pattern in exclude:
+        drv, root, pattern_parts = flavour.parse_parts((pattern,))
+        if drv or root or len(pattern_parts) != 1:
+            return PatternSet(exclude, pathcls).match
+        matchers.append(flavour.compile_pattern(pattern_parts[0]))
+    # Patterns of a single component only need the names of paths.
+    def excluded(path):
+        name = path.name
+        for match in matchers:
+            if match(name):
+                return True
+        return False
+    return excluded
 
 
 class _Selector:
-    """A selector matches a specific glob pattern part against the children
-    of a given path."""
-
-    def __init__(self, child_parts, flavour):
-        self.child_parts = child_parts
-        if child_parts:
-            self.successor = _make_selector(child_parts, flavour)
-            self.dironly = True
-        else:
-            self.successor = _TerminatingSelector()
-            self.dironly = False
+    """A selector matches whole glob patterns against the descendants of
+    a given path.
+
+    The patterns are compiled into a single list of steps, one per
+    component, each pattern being closed by an end step.  The matching
+    works as a state machine: each directory visited is paired with the
+    set of positions in the list it has reached, and matches the patterns
+    whose end it has reached.  A '**' step may be skipped, so a position
+    before it implies the position after it.  Only paths matched by the
+    last step of a pattern may be something else than a directory.  The
+    tree is walked by a single loop over an explicit queue, the children
+    of a directory being matched against all of its positions at once, so
+    that several patterns are matched in a single walk.
+
+    A selector made with *multi* true yields (index, path) pairs, index
+    being that of the pattern matched; otherwise, it yields paths.
+    """
 
-    def select_from(self, parent_path):
+    def __init__(self, step_lists, flavour, multi=False):
+        steps = []
+        starts = []
+        ends = {}
+        unique_ends = set()
+        for index, pattern_steps in enumerate(step_lists):
+            starts.append(len(steps))
+            steps.extend(pattern_steps)
+            # With at most one '**', every match is reached from a single
+            # directory where the '**' ends, so no path comes up twice.
+            if sum(kind == _RECURSIVE for kind, _ in pattern_steps) > 1:
+                unique_ends.add(len(steps))
+            ends[len(steps)] = index
+            steps.append((_END, index))
+        closures = []
+        for i in reversed(range(len(steps))):
+            if steps[i][0] == _RECURSIVE:
+                closures.append(closures[-1] | {i})
+            else:
+                closures.append(frozenset([i]))
+        closures.reverse()
+        self.steps = steps
+        self.closures = closures
+        self.ends = ends
+        self.end_positions = frozenset(ends)
+        self.initial = frozenset().union(*[closures[i] for i in starts])
+        # Looking up literal first steps fails anyway if the parent path
+        # is not a directory.
+        self.first_literal = all(steps[i][0] == _LITERAL for i in starts)
+        self.multi = multi
+        # Matches of patterns with several '**' are remembered by their
+        # (casefolded) string, which is shared with the path on POSIX.
+        self.unique_ends = frozenset(unique_ends)
+        self.casefold = flavour.casefold if unique_ends else None
+        self._transitions = {}
+        self._splits = {}
+
+    def _transition(self, positions):
+        # Return what a directory at the given positions should be
+        # matched against: the end positions it has reached, the runs of
+        # literal names to look up below it, the single literal names to
+        # find among its entries if it is listed anyway (or None), the
+        # wildcards to match its entries against, and the positions its
+        # subdirectories reach through '**' (or None).  Literal names and
+        # wildcards come with the positions they lead to, the end
+        # positions they reach directly, so that they may name something
+        # else than a directory (or None), and whether they lead to end
+        # positions only.
+        try:
+            return self._transitions[positions]
+        except KeyError:
+            pass
+        steps = self.steps
+        closures = self.closures
+        end_positions = self.end_positions
+        literals = {}
+        wildcards = []
+        recursive = None
+        for i in sorted(positions):
+            kind, arg = steps[i]
+            if kind == _END:
+                continue
+            next_positions = closures[i + 1]
+            last = next_positions if steps[i + 1][0] == _END else None
+            if kind == _LITERAL:
+                if arg in literals:
+                    other_positions, other_last = literals[arg]
+                    next_positions = next_positions | other_positions
+                    if other_last is not None:
+                        last = other_last if last is None else last | other_last
+                literals[arg] = (next_positions, last)
+            elif kind == _WILDCARD:
+                wildcards.append((arg, next_positions, last))
+            elif recursive is None:
+                recursive = closures[i]
+            else:
+                recursive |= closures[i]
+        lookups = []
+        named = None
+        if wildcards or recursive is not None:
+            named = {}
+        for names, (next_positions, last) in literals.items():
+            lookup = (next_positions, last, next_positions <= end_positions)
+            if named is not None and len(names) == 1:
+                named[names[0]] = lookup
+            else:
+                lookups.append((names,) + lookup)
+        matched = self._split(positions)[0]
+        result = (matched, lookups, named, wildcards, recursive)
+        self._transitions[positions] = result
+        return result
+
+    def _split(self, positions):
+        # Return the end positions among the given ones, and the others.
+        try:
+            return self._splits[positions]
+        except KeyError:
+            matched = positions & self.end_positions
+            result = self._splits[positions] = (matched, positions - matched)
+            return result
+
+    def select_from(self, parent_path, stream=False, breadth_first=False,
+                    workers=None, ordered=False, exclude=None,
+                    max_depth=None, limit=None, keep_entries=False):
         """Iterate over all child paths of `parent_path` matched by this
-        selector.  This can contain parent_path itself."""
+        selector.  This can contain parent_path itself.  If *stream* is
+        true, directories are kept open while their entries are matched,
+        instead of being listed first.  Directories are visited depth
+        first, or breadth first if *breadth_first* is true.  If *workers*
+        is given, directories are visited by that many threads, and
+        results come in no particular order unless *ordered* is true.
+        Paths for which the *exclude* predicate is true are left out,
+        along with everything below them, and so are paths more than
+        *max_depth* levels below parent_path if it is given.  If *limit*
+        is given, the walk stops after yielding that many results, and
+        directories are read in batches as with *stream*.  If
+        *keep_entries* is true, paths read from directory listings keep
+        their os.DirEntry."""
+        if max_depth is not None and max_depth < 0:
+            raise ValueError("max_depth must not be negative")
+        if limit is not None:
+            if limit < 0:
+                raise ValueError("limit must not be negative")
+            if limit == 0:
+                return iter([])
         path_cls = type(parent_path)
-        is_dir = path_cls.is_dir
-        exists = path_cls.exists
-        scandir = path_cls._scandir
-        if not is_dir(parent_path):
+        if not self.first_literal and not path_cls.is_dir(parent_path):
             return iter([])
-        return self._select_from(parent_path, is_dir, exists, scandir)
-
-
-class _TerminatingSelector:
-
-    def _select_from(self, parent_path, is_dir, exists, scandir):
-        yield parent_path
-
-
-class _PreciseSelector(_Selector):
-
-    def __init__(self, name, child_parts, flavour):
-        self.name = name
-        _Selector.__init__(self, child_parts, flavour)
-
-    def _select_from(self, parent_path, is_dir, exists, scandir):
+        args = (parent_path, path_cls.is_dir, path_cls.exists,
+                path_cls._scandir, exclude, max_depth, keep_entries)
+        if workers is not None:
+            if stream:
+                raise ValueError("stream and workers can't be used together")
+            results = self._select_parallel(*args, breadth_first, workers,
+                                            ordered)
+        else:
+            results = self._select_from(*args, stream or limit is not None,
+                                        breadth_first)
+        if limit is not None:
+            return self._limit(results, limit)
+        return results
+
+    @staticmethod
+    def _limit(results, limit):
+        # Yield the first *limit* results, and end the walk right after.
         try:
-            path = parent_path._make_child_relpath(self.name)
-            if (is_dir if self.dironly else exists)(path):
-                for p in self.successor._select_from(path, is_dir, exists, scandir):
-                    yield p
-        except PermissionError:
-            return
-
-
-class _WildcardSelector(_Selector):
-
-    def __init__(self, pat, child_parts, flavour):
-        self.match = flavour.compile_pattern(pat)
-        _Selector.__init__(self, child_parts, flavour)
-
-    def _select_from(self, parent_path, is_dir, exists, scandir):
+            for count, result in enumerate(results, 1):
+                yield result
+                if count == limit:
+                    break
+        finally:
+            results.close()
+
+    def _select_from(self, parent_path, is_dir, exists, scandir, exclude,
+                     max_depth, keep_entries, stream, breadth_first):
+        yielded = None if self.casefold is None else set()
+        # Directories still to visit are taken from the end of the queue
+        # for a depth-first walk, or from its start for a breadth-first
+        # one.
+        queue = deque([(parent_path, self.initial, 0)])
+        pop = queue.popleft if breadth_first else queue.pop
+        while queue:
+            path, positions, depth = pop()
+            queued = []
+            for matches in self._visit(path, positions, depth, is_dir,
+                                       exists, scandir, exclude, max_depth,
+                                       keep_entries, stream, queued):
+                yield from self._results(matches, yielded)
+            if breadth_first:
+                queue.extend(queued)
+            else:
+                queue.extend(reversed(queued))
+
+    def _select_parallel(self, parent_path, is_dir, exists, scandir,
+                         exclude, max_depth, keep_entries, breadth_first,
+                         workers, ordered):
+        # Same as _select_from(), with directories visited by a pool of
+        # threads.  In order, the walk waits for each directory in turn
+        # while the ones already found are visited ahead; otherwise,
+        # results are taken from whichever directory is done first.
+        from concurrent.futures import (
+            ThreadPoolExecutor, wait, FIRST_COMPLETED)
+        yielded = None if self.casefold is None else set()
+        executor = ThreadPoolExecutor(workers)
+        pending = ()
         try:
-            with scandir(parent_path) as scandir_it:
-                entries = list(scandir_it)
-            for entry in entries:
-                if self.dironly:
-                    try:
-                        # "entry.is_dir()" can raise PermissionError
-                        # in some cases (see bpo-38894), which is not
-                        # among the errors ignored by _ignore_error()
-                        if not entry.is_dir():
-                            continue
-                    except OSError as e:
-                        if not _ignore_error(e):
-                            raise
+            def submit(path, positions, depth):
+                return executor.submit(self._visit_all, path, positions,
+                                       depth, is_dir, exists, scandir,
+                                       exclude, max_depth, keep_entries)
+            if ordered:
+                queue = pending = deque([submit(parent_path, self.initial,
+                                                0)])
+                pop = queue.popleft if breadth_first else queue.pop
+                while queue:
+                    matches, queued = pop().result()
+                    yield from self._results(matches, yielded)
+                    futures = [submit(*child) for child in queued]
+                    if breadth_first:
+                        queue.extend(futures)
+                    else:
+                        queue.extend(reversed(futures))
+            else:
+                pending = {submit(parent_path, self.initial, 0)}
+                while pending:
+                    done, pending = wait(pending,
+                                         return_when=FIRST_COMPLETED)
+                    for future in done:
+                        matches, queued = future.result()
+                        pending.update(submit(*child) for child in queued)
+                        yield from self._results(matches, yielded)
+        finally:
+            # Directories not visited yet are given up (shutdown() only
+            # takes cancel_futures from Python 3.9).
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _visit_all(self, path, positions, depth, is_dir, exists, scandir,
+                   exclude, max_depth, keep_entries):
+        # Return the matches and the directories to queue of _visit().
+        matches = []
+        queued = []
+        for batch in self._visit(path, positions, depth, is_dir, exists,
+                                 scandir, exclude, max_depth, keep_entries,
+                                 False, queued):
+            matches += batch
+        return matches, queued
+
+    def _visit(self, path, positions, depth, is_dir, exists, scandir,
+               exclude, max_depth, keep_entries, stream, queued):
+        # Match the children of a directory at the given positions and
+        # depth.  Matches that can't match anything further are yielded
+        # in lists of (path, end positions) pairs, other matching
+        # directories are added to *queued* along with their positions
+        # and depth.  Children excluded are dropped before anything is
+        # done with them.
+        matched, lookups, named, wildcards, recursive = \
+            self._transition(positions)
+        if matched:
+            yield [(path, matched)]
+        if max_depth is not None:
+            if depth >= max_depth:
+                return
+            # Runs of literal names may reach too deep.
+            lookups = [lookup for lookup in lookups
+                       if depth + len(lookup[0]) <= max_depth]
+        matches = []
+        children = []
+        self._lookup(path, lookups, depth, is_dir, exists, exclude, matches,
+                     children)
+        if named is not None:
+            # Literal names are taken from the listing of the directory
+            # when found there, and looked up otherwise.
+            named = dict(named)
+            try:
+                with scandir(path) as scandir_it:
+                    if stream:
+                        # Only subdirectories to descend into are kept
+                        # until the directory is done.
+                        while True:
+                            entries = list(islice(scandir_it,
+                                                  _STREAM_BATCH_SIZE))
+                            if not entries:
+                                break
+                            self._select_entries(path, entries, depth + 1,
+                                                 named, wildcards,
+                                                 recursive, matches,
+                                                 children, keep_entries)
+                            if exclude is not None:
+                                matches = [match for match in matches
+                                           if not exclude(match[0])]
+                            yield matches
+                            matches = []
+                    else:
+                        entries = list(scandir_it)
+                if not stream:
+                    self._select_entries(path, entries, depth + 1, named,
+                                         wildcards, recursive, matches,
+                                         children, keep_entries)
+            except PermissionError:
+                pass
+            if named:
+                self._lookup(path, [((name,),) + lookup
+                                    for name, lookup in named.items()],
+                             depth, is_dir, exists, exclude, matches,
+                             children)
+        if exclude is not None:
+            matches = [match for match in matches if not exclude(match[0])]
+            children = [child for child in children
+                        if not exclude(child[0])]
+        # Directories matching whole patterns are yielded along with their
+        # siblings, and only queued for what they may still match below
+        # them.
+        split = self._split
+        for child, child_positions, child_depth in children:
+            child_matched, child_positions = split(child_positions)
+            if child_matched:
+                matches.append((child, child_matched))
+            if child_positions and (max_depth is None or
+                                    child_depth < max_depth):
+                queued.append((child, child_positions, child_depth))
+        yield matches
+
+    def _lookup(self, path, lookups, depth, is_dir, exists, exclude,
+                matches, children):
+        # Look up runs of literal names below a directory at the given
+        # depth, adding them to *matches* or *children*.  Runs going
+        # through an excluded directory are skipped; the last path of a
+        # run is checked by the caller.
+        for names, child_positions, last, final in lookups:
+            child = path
+            for name in names[:-1]:
+                child = child._make_child_relpath(name)
+                if exclude is not None and exclude(child):
+                    child = None
+                    break
+            if child is None:
+                continue
+            child = child._make_child_relpath(names[-1])
+            try:
+                if final:
+                    if exists(child):
+                        matches.append((child, child_positions))
+                elif is_dir(child):
+                    children.append((child, child_positions,
+                                     depth + len(names)))
+                elif last is not None and exists(child):
+                    matches.append((child, last))
+            except PermissionError:
+                pass
+
+    def _results(self, matches, yielded):
+        # Iterate over the results for (path, end positions) pairs, adding
+        # those of patterns with several '**' to *yielded* unless they are
+        # already in it.
+        if not self.multi:
+            if yielded is None:
+                for path, _ in matches:
+                    yield path
+            else:
+                casefold = self.casefold
+                for path, _ in matches:
+                    key = casefold(str(path))
+                    if key not in yielded:
+                        yielded.add(key)
+                        yield path
+            return
+        ends = self.ends
+        unique_ends = self.unique_ends
+        for path, matched in matches:
+            if len(matched) > 1:
+                matched = sorted(matched)
+            key = None
+            for end in matched:
+                if end in unique_ends:
+                    if key is None:
+                        key = self.casefold(str(path))
+                    if (end, key) in yielded:
                         continue
-                name = entry.name
-                if self.match(name):
-                    path = parent_path._make_child_relpath(name)
-                    for p in self.successor._select_from(path, is_dir, exists, scandir):
-                        yield p
-        except PermissionError:
+                    yielded.add((end, key))
+                yield ends[end], path
+
+    def _select_entries(self, path, entries, depth, named, wildcards,
+                        recursive, matches, children, keep_entries=False):
+        # Match the entries of a directory against its literal names,
+        # wildcard and recursive steps, adding them to *matches* or to
+        # *children* with the given depth.  Names found are removed from
+        # *named*.  With *keep_entries*, the new paths keep the entry they
+        # come from.
+        if keep_entries:
+            start_matches = len(matches)
+            start_children = len(children)
+            self._select_entries(path, entries, depth, named, wildcards,
+                                 recursive, matches, children)
+            by_name = {entry.name: entry for entry in entries}
+            for child, _ in islice(matches, start_matches, None):
+                child._dir_entry = by_name[child.name]
+            for child, _, _ in islice(children, start_children, None):
+                child._dir_entry = by_name[child.name]
             return
-
-
-class _RecursiveWildcardSelector(_Selector):
-
-    def __init__(self, pat, child_parts, flavour):
-        _Selector.__init__(self, child_parts, flavour)
-
-    def _iterate_directories(self, parent_path, is_dir, scandir):
-        yield parent_path
-        try:
-            with scandir(parent_path) as scandir_it:
-                entries = list(scandir_it)
+        make_child = path._make_child_relpath
+        if len(wildcards) == 1 and recursive is None and not named:
+            # Common case of a single wildcard step.
+            match, child_positions, last = wildcards[0]
+            if last is not None:
+                matches += [(make_child(entry.name), last)
+                            for entry in entries if match(entry.name)]
+                return
             for entry in entries:
-                entry_is_dir = False
+                name = entry.name
+                if not match(name):
+                    continue
                 try:
-                    entry_is_dir = entry.is_dir()
+                    # "entry.is_dir()" can raise PermissionError
+                    # in some cases (see bpo-38894), which is not
+                    # among the errors ignored by _ignore_error()
+                    if not entry.is_dir():
+                        continue
                 except OSError as e:
                     if not _ignore_error(e):
                         raise
-                if entry_is_dir and not entry.is_symlink():
-                    path = parent_path._make_child_relpath(entry.name)
-                    for p in self._iterate_directories(path, is_dir, scandir):
-                        yield p
-        except PermissionError:
+                    continue
+                children.append((make_child(name), child_positions, depth))
             return
-
-    def _select_from(self, parent_path, is_dir, exists, scandir):
-        try:
-            yielded = set()
+        for entry in entries:
+            name = entry.name
+            child_positions = None
+            last = None
+            final = True
+            # Symbolic links named literally are looked up, as they may
+            # be dangling.
+            if name in named and not entry.is_symlink():
+                child_positions, last, final = named.pop(name)
+            for match, next_positions, next_last in wildcards:
+                if match(name):
+                    if child_positions is None:
+                        child_positions = next_positions
+                    else:
+                        child_positions = child_positions | next_positions
+                    if next_last is None:
+                        final = False
+                    elif last is None:
+                        last = next_last
+                    else:
+                        last = last | next_last
+            if child_positions is None and recursive is None:
+                continue
+            if final and recursive is None:
+                matches.append((make_child(name), child_positions))
+                continue
+            entry_is_dir = False
             try:
-                successor_select = self.successor._select_from
-                for starting_point in self._iterate_directories(parent_path, is_dir, scandir):
-                    for p in successor_select(starting_point, is_dir, exists, scandir):
-                        if p not in yielded:
-                            yield p
-                            yielded.add(p)
-            finally:
-                yielded.clear()
-        except PermissionError:
-            return
+                entry_is_dir = entry.is_dir()
+            except OSError as e:
+                if not _ignore_error(e):
+                    raise
+            if entry_is_dir:
+                # Don't follow symlinks below '**'.
+                if recursive is not None and not entry.is_symlink():
+                    if child_positions is None:
+                        child_positions = recursive
+                    else:
+                        child_positions = child_positions | recursive
+                if child_positions is not None:
+                    children.append((make_child(name), child_positions,
+                                     depth))
+            elif last is not None:
+                matches.append((make_child(name), last))
 
 
 #
@@ -482,8 +1128,9 @@ class PurePath(object):
     directly, regardless of your system.
     """
     __slots__ = (
-        '_drv', '_root', '_parts',
+        '_drv', '_root', '_cached_parts',
         '_str', '_hash', '_pparts', '_cached_cparts',
+        '_lazy_parent', '_lazy_name', '__weakref__',
     )
 
     def __new__(cls, *args):
@@ -501,6 +1148,99 @@ class PurePath(object):
         # when pickling related paths.
         return (self.__class__, tuple(self._parts))
 
+    @classmethod
+    def from_strings(cls, strings):
+        """Return an iterator of paths built from each item of *strings*,
+        as by calling the class with that single argument, but faster."""
+        if cls is PurePath:
+            cls = PureWindowsPath if os.name == 'nt' else PurePosixPath
+        return cls._from_strings(strings)
+
+    @classmethod
+    def _from_strings(cls, strings):
+        # Same as _from_parts() on each string, with all lookups hoisted.
+        # Strings that need parsing are split into their parent directory
+        # and final name, and the parsed form of recently seen parent
+        # directories is reused.
+        flavour = cls._flavour
+        sep = flavour.sep
+        altsep = flavour.altsep
+        new = object.__new__
+        is_canonical = flavour.is_canonical
+        is_plain_name = flavour.is_plain_name
+        splitroot = flavour.splitroot
+        parse_str = cls._parse_str
+        from_parts = cls._from_parts
+        intern = sys.intern
+        heads = {}
+        for a in strings:
+            if type(a) is not str:
+                yield from_parts((a,))
+                continue
+            if altsep:
+                a = a.replace(altsep, sep)
+            self = new(cls)
+            self._lazy_parent = None
+            drv, root, rel = splitroot(a)
+            if is_canonical(a):
+                self._drv = drv
+                self._root = root
+                self._str = a
+                self._cached_parts = None
+                yield self
+                continue
+            head, _, name = rel.rpartition(sep)
+            if head and is_plain_name(name):
+                head = a[:len(a) - len(name)]
+                try:
+                    drv, root, parts = heads[head]
+                except KeyError:
+                    if len(heads) >= 1024:
+                        heads.clear()
+                    drv, root, parts = heads[head] = parse_str(head)
+                parts = parts + [intern(name)]
+            else:
+                drv, root, parts = parse_str(a)
+            self._drv = drv
+            self._root = root
+            self._cached_parts = parts
+            yield self
+
+    @classmethod
+    def common_ancestor(cls, *paths):
+        """Return the deepest path that all the given paths are relative to.
+        The paths may also be passed as a single iterable.  Raise ValueError
+        if there are none, or if they don't share the same anchor."""
+        cls = _resolve_path_class(cls)
+        if len(paths) == 1 and not isinstance(paths[0], (str, os.PathLike)):
+            paths = paths[0]
+        flavour = cls._flavour
+        first = None
+        for path in paths:
+            if not (isinstance(path, PurePath) and path._flavour is flavour):
+                path = cls._from_parts((path,))
+            if first is None:
+                first = path
+                prefix = path._cparts
+                n = len(prefix)
+                continue
+            cparts = path._cparts
+            if len(cparts) < n:
+                n = len(cparts)
+            for i in range(n):
+                if cparts[i] != prefix[i]:
+                    n = i
+                    break
+            if n == 0 and (first.drive or first.root or
+                           path.drive or path.root):
+                if bool(first.root) != bool(path.root):
+                    raise ValueError("Can't mix absolute and relative paths")
+                raise ValueError("Paths don't have the same anchor")
+        if first is None:
+            raise ValueError("common_ancestor() arg is an empty sequence")
+        return cls._from_parsed_parts(first.drive, first.root,
+                                      first._parts[:n])
+
     @classmethod
     def _parse_args(cls, args):
         # This is useful when you don't want to create an instance, just
@@ -519,17 +1259,45 @@ class PurePath(object):
                         "argument should be a str object or an os.PathLike "
                         "object returning str, not %r"
                         % type(a))
+        if len(parts) == 1:
+            return cls._parse_str(parts[0])
         return cls._flavour.parse_parts(parts)
 
+    @classmethod
+    def _parse_str(cls, part):
+        flavour = cls._flavour
+        if _parse_cache.maxsize:
+            # The cached parts list is shared between paths, which is fine
+            # as paths never modify their parts in place.
+            key = (flavour, part)
+            parsed = _parse_cache.get(key)
+            if parsed is None:
+                parsed = flavour.parse_parts((part,))
+                _parse_cache.put(key, parsed)
+            return parsed
+        return flavour.parse_parts((part,))
+
     @classmethod
     def _from_parts(cls, args):
         # We need to call _parse_args on the instance, so as to get the
         # right flavour.
         self = object.__new__(cls)
+        if len(args) == 1:
+            a = args[0]
+            flavour = cls._flavour
+            if type(a) is str and flavour.is_canonical(a):
+                # Only keep the string and its anchor, the parts are parsed
+                # on first access (see _load_parts).
+                self._drv, self._root, _ = flavour.splitroot(a)
+                self._str = a
+                self._cached_parts = None
+                self._lazy_parent = None
+                return self
         drv, root, parts = self._parse_args(args)
         self._drv = drv
         self._root = root
-        self._parts = parts
+        self._cached_parts = parts
+        self._lazy_parent = None
         return self
 
     @classmethod
@@ -537,7 +1305,8 @@ class PurePath(object):
         self = object.__new__(cls)
         self._drv = drv
         self._root = root
-        self._parts = parts
+        self._cached_parts = parts
+        self._lazy_parent = None
         return self
 
     @classmethod
@@ -547,12 +1316,56 @@ class PurePath(object):
         else:
             return cls._flavour.join(parts)
 
+    def _load_parts(self):
+        parent = self._lazy_parent
+        if parent is None:
+            self._cached_parts = self._parse_str(self._str)[2]
+            return
+        # Walk up to the nearest ancestor whose parts are known, without
+        # recursing, then build the parts of each path on the way down.
+        chain = [self]
+        while (parent._cached_parts is None and
+               parent._lazy_parent is not None):
+            chain.append(parent)
+            parent = parent._lazy_parent
+        parts = parent._parts
+        for path in reversed(chain):
+            parts = parts + [path._lazy_name]
+            path._cached_parts = parts
+
     def _make_child(self, args):
+        if len(args) == 1:
+            a = args[0]
+            if type(a) is str and self._flavour.is_plain_name(a):
+                return self._make_child_relpath(sys.intern(a))
         drv, root, parts = self._parse_args(args)
         drv, root, parts = self._flavour.join_parsed_parts(
             self._drv, self._root, self._parts, drv, root, parts)
         return self._from_parsed_parts(drv, root, parts)
 
+    def _make_child_relpath(self, part):
+        # This is an optimization used for dir walking and joining of
+        # single names.  `part` must be a single part relative to this path.
+        # Rather than copying our parts, the child only refers to us and its
+        # name, and shares our drive and root; its own parts are built on
+        # first access (see _load_parts).
+        path_str = str(self)
+        if path_str == '.':
+            child_str = part
+        elif (path_str[-1] == self._flavour.sep or
+              path_str[-1] == ':' and path_str == self.anchor):
+            child_str = path_str + part
+        else:
+            child_str = path_str + self._flavour.sep + part
+        child = object.__new__(type(self))
+        child._drv = self._drv
+        child._root = self._root
+        child._str = child_str
+        child._cached_parts = None
+        child._lazy_parent = self
+        child._lazy_name = part
+        return child
+
     def __str__(self):
         """Return the string representation of the path, suitable for
         passing to system calls."""
@@ -580,6 +1393,11 @@ class PurePath(object):
     def __repr__(self):
         return "{}({!r})".format(self.__class__.__name__, self.as_posix())
 
+    def intern(self):
+        """Return the path equal to this one from the default PathPool,
+        adding this path to the pool if there is none."""
+        return _path_pool.intern(self)
+
     def as_uri(self):
         """Return the path as a 'file' URI."""
         if not self.is_absolute():
@@ -633,6 +1451,16 @@ class PurePath(object):
     root = property(attrgetter('_root'),
                     doc="""The root of the path, if any.""")
 
+    @property
+    def _parts(self):
+        # The parts of paths built from a canonical string or from a parent
+        # path are only worked out on first access.
+        parts = self._cached_parts
+        if parts is None:
+            self._load_parts()
+            parts = self._cached_parts
+        return parts
+
     @property
     def anchor(self):
         """The concatenation of the drive and root, or ''."""
@@ -642,7 +1470,11 @@ class PurePath(object):
     @property
     def name(self):
         """The final path component, if any."""
-        parts = self._parts
+        if self._lazy_parent is not None:
+            return self._lazy_name
+        parts = self._cached_parts
+        if parts is None:
+            parts = self._parts
         if len(parts) == (1 if (self._drv or self._root) else 0):
             return ''
         return parts[-1]
@@ -731,36 +1563,66 @@ class PurePath(object):
         #   Path('c:/').relative_to('/')   raise ValueError
         if not other:
             raise TypeError("need at least one argument")
-        parts = self._parts
-        drv = self._drv
-        root = self._root
-        if root:
-            abs_parts = [drv, root] + parts[1:]
-        else:
-            abs_parts = parts
-        to_drv, to_root, to_parts = self._parse_args(other)
-        if to_root:
-            to_abs_parts = [to_drv, to_root] + to_parts[1:]
-        else:
-            to_abs_parts = to_parts
-        n = len(to_abs_parts)
-        cf = self._flavour.casefold_parts
-        if (root or drv) if n == 0 else cf(abs_parts[:n]) != cf(to_abs_parts):
-            formatted = self._format_parsed_parts(to_drv, to_root, to_parts)
+        result = self._relative_parts(*self._coerce(other))
+        if result is None:
             raise ValueError("{!r} is not in the subpath of {!r}"
                     " OR one path is relative and the other is absolute."
-                             .format(str(self), str(formatted)))
-        return self._from_parsed_parts('', root if n == 1 else '',
-                                       abs_parts[n:])
+                             .format(str(self), str(self._from_parts(other))))
+        return self._from_parsed_parts('', result[0], result[1])
+
+    def relative_to_many(self, paths):
+        """Iterate over the given paths made relative to this one, as
+        path.relative_to(self) would.  Raise ValueError when reaching a
+        path that is not a subpath of this one.
+        """
+        drv, root, cparts = self._drv, self._root, self._cparts
+        for path in paths:
+            if not isinstance(path, PurePath):
+                path = self._from_parts((path,))
+            result = path._relative_parts(drv, root, cparts)
+            if result is None:
+                raise ValueError("{!r} is not in the subpath of {!r}"
+                        " OR one path is relative and the other is absolute."
+                                 .format(str(path), str(self)))
+            yield path._from_parsed_parts('', result[0], result[1])
 
     def is_relative_to(self, *other):
         """Return True if the path is relative to another path or False.
         """
-        try:
-            self.relative_to(*other)
-            return True
-        except ValueError:
-            return False
+        if not other:
+            raise TypeError("need at least one argument")
+        return self._relative_parts(*self._coerce(other)) is not None
+
+    def _coerce(self, args):
+        # Turn relative_to() style arguments into the drive, root and
+        # casefolded parts of a single path, reusing those of an existing
+        # path of our flavour, and without building one otherwise.
+        if len(args) == 1:
+            a = args[0]
+            if isinstance(a, PurePath) and a._flavour is self._flavour:
+                return a._drv, a._root, a._cparts
+        drv, root, parts = self._parse_args(args)
+        return drv, root, self._flavour.casefold_parts(parts)
+
+    def _relative_parts(self, to_drv, to_root, to_cparts):
+        # Return the (root, parts) of this path relative to the path with
+        # the given drive, root and casefolded parts, or None if it is not
+        # a subpath.  The casefolded parts hold the drive and root together
+        # as their first item.
+        root = self._root
+        cparts = self._cparts
+        n = len(to_cparts)
+        if root and not to_root:
+            # Only the bare drive of a rooted path matches, leaving the root.
+            if to_drv and n == 1 and to_cparts[0] + root == cparts[0]:
+                return root, [root] + self._parts[1:]
+            return None
+        if n == 0:
+            if root or self._drv:
+                return None
+        elif cparts[:n] != to_cparts:
+            return None
+        return '', self._parts[n:]
 
     @property
     def parts(self):
@@ -797,9 +1659,13 @@ class PurePath(object):
     @property
     def parent(self):
         """The logical parent of the path."""
+        if self._lazy_parent is not None:
+            return self._lazy_parent
         drv = self._drv
         root = self._root
-        parts = self._parts
+        parts = self._cached_parts
+        if parts is None:
+            parts = self._parts
         if len(parts) == 1 and (drv or root):
             return self
         return self._from_parsed_parts(drv, root, parts[:-1])
@@ -825,26 +1691,14 @@ class PurePath(object):
         """
         Return True if this path matches the given pattern.
         """
-        cf = self._flavour.casefold
-        path_pattern = cf(path_pattern)
-        drv, root, pat_parts = self._flavour.parse_parts((path_pattern,))
-        if not pat_parts:
-            raise ValueError("empty pattern")
-        if drv and drv != cf(self._drv):
-            return False
-        if root and root != cf(self._root):
-            return False
-        parts = self._cparts
-        if drv or root:
-            if len(pat_parts) != len(parts):
-                return False
-            pat_parts = pat_parts[1:]
-        elif len(pat_parts) > len(parts):
-            return False
-        for part, pat in zip(reversed(parts), reversed(pat_parts)):
-            if not fnmatch.fnmatchcase(part, pat):
-                return False
-        return True
+        return _compile_path_pattern(path_pattern, type(self)).match(self)
+
+    def full_match(self, pattern):
+        """
+        Return True if this whole path matches the given pattern, where a
+        '**' component matches any number of components, even none.
+        """
+        return _compile_path_pattern(pattern, type(self), True).match(self)
 
 # Can't subclass os.PathLike from PurePath and keep the constructor
 # optimizations in PurePath._parse_args().
@@ -883,7 +1737,10 @@ class Path(PurePath):
     object. You can also instantiate a PosixPath or WindowsPath directly,
     but cannot instantiate a WindowsPath on a POSIX system or vice versa.
     """
-    __slots__ = ()
+    # _dir_entry holds the os.DirEntry a path was read from when kept (see
+    # iterdir()), and None otherwise.  Only children built by
+    # _make_child_relpath() can have one, so it is only set for them.
+    __slots__ = ('_dir_entry',)
 
     def __new__(cls, *args, **kwargs):
         if cls is Path:
@@ -895,10 +1752,20 @@ class Path(PurePath):
         return self
 
     def _make_child_relpath(self, part):
-        # This is an optimization used for dir walking.  `part` must be
-        # a single part relative to this path.
-        parts = self._parts + [part]
-        return self._from_parsed_parts(self._drv, self._root, parts)
+        child = PurePath._make_child_relpath(self, part)
+        child._dir_entry = None
+        return child
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Return an iterator of paths built from each item of *strings*,
+        as by calling the class with that single argument, but faster."""
+        if cls is Path:
+            cls = WindowsPath if os.name == 'nt' else PosixPath
+        if not cls._flavour.is_supported:
+            raise NotImplementedError("cannot instantiate %r on your system"
+                                      % (cls.__name__,))
+        return cls._from_strings(strings)
 
     def __enter__(self):
         return self
@@ -941,10 +1808,23 @@ class Path(PurePath):
             other_st = self.__class__(other_path).stat()
         return os.path.samestat(st, other_st)
 
-    def iterdir(self):
+    def iterdir(self, *, keep_entries=False):
         """Iterate over the files in this directory.  Does not yield any
         result for the special paths '.' and '..'.
+
+        If *keep_entries* is true, the paths yielded keep the os.DirEntry
+        they were read from, so that their stat() (except on Windows) and
+        is_*() methods use the information it caches instead of making
+        system calls.  That information is not updated afterwards.
         """
+        if keep_entries:
+            with self._scandir() as scandir_it:
+                entries = list(scandir_it)
+            for entry in entries:
+                child = self._make_child_relpath(entry.name)
+                child._dir_entry = entry
+                yield child
+            return
         for name in os.listdir(self):
             yield self._make_child_relpath(name)
 
@@ -954,9 +1834,45 @@ class Path(PurePath):
         # includes scandir(), which is used to implement glob().
         return os.scandir(self)
 
-    def glob(self, pattern):
+    def glob(self, pattern, *, stream=False, breadth_first=False,
+             workers=None, ordered=False, exclude=None, max_depth=None,
+             limit=None, keep_entries=False):
         """Iterate over this subtree and yield all existing files (of any
         kind, including directories) matching the given relative pattern.
+        A component of the pattern may hold alternatives, as in '*.{c,h}'.
+
+        If *stream* is true, the entries of each directory are matched as
+        they are read rather than listed first, so that memory use stays
+        bounded in huge directories.  A directory is then kept open while
+        its matches are consumed, and changes made to it meanwhile may or
+        may not be reflected in the results.
+
+        Directories are walked depth first, or breadth first if
+        *breadth_first* is true, in which case shallower matches all come
+        before deeper ones.
+
+        If *workers* is given, directories are scanned by a pool of that
+        many threads, which helps on high latency file systems.  Matches
+        are then yielded as soon as found, unless *ordered* is true, in
+        which case they come in the same order as without threads.
+        *stream* can't be combined with *workers*.
+
+        *exclude* may be a pattern, a list of patterns or a predicate
+        taking a path: paths it matches are left out of the results, and
+        directories it matches are not scanned at all.  Patterns are
+        matched like PurePath.match() does, e.g. '.git' or '*.pyc'.
+
+        If *max_depth* is given, paths more than that many levels below
+        this one are not yielded, and directories at that depth are not
+        scanned; 1 stands for the children of this path.
+
+        If *limit* is given, at most that many paths are yielded, and the
+        walk stops as soon as the last one is found.  Directories are
+        then read in batches as with *stream*, so that no more of them is
+        read than needed.
+
+        If *keep_entries* is true, the paths read from directory listings
+        keep their os.DirEntry, as with iterdir().
         """
         sys.audit("pathlib.Path.glob", self, pattern)
         if not pattern:
@@ -965,22 +1881,74 @@ class Path(PurePath):
         if drv or root:
             raise NotImplementedError("Non-relative patterns are unsupported")
         selector = _make_selector(tuple(pattern_parts), self._flavour)
-        for p in selector.select_from(self):
+        exclude = _make_exclude(exclude, type(self))
+        for p in selector.select_from(self, stream, breadth_first, workers,
+                                      ordered, exclude, max_depth,
+                                      limit, keep_entries):
             yield p
 
-    def rglob(self, pattern):
+    def rglob(self, pattern, *, stream=False, breadth_first=False,
+              workers=None, ordered=False, exclude=None, max_depth=None,
+              limit=None, keep_entries=False):
         """Recursively yield all existing files (of any kind, including
         directories) matching the given relative pattern, anywhere in
-        this subtree.
+        this subtree.  See glob() for the keyword arguments.
         """
         sys.audit("pathlib.Path.rglob", self, pattern)
         drv, root, pattern_parts = self._flavour.parse_parts((pattern,))
         if drv or root:
             raise NotImplementedError("Non-relative patterns are unsupported")
         selector = _make_selector(("**",) + tuple(pattern_parts), self._flavour)
-        for p in selector.select_from(self):
+        exclude = _make_exclude(exclude, type(self))
+        for p in selector.select_from(self, stream, breadth_first, workers,
+                                      ordered, exclude, max_depth,
+                                      limit, keep_entries):
             yield p
 
+    def glob_many(self, patterns, *, stream=False, breadth_first=False,
+                  workers=None, ordered=False, exclude=None,
+                  max_depth=None, limit=None, keep_entries=False):
+        """Iterate over this subtree and yield (index, path) pairs for all
+        existing files matching any of the given relative patterns, index
+        being that of the pattern matched in *patterns*.  A path matching
+        several patterns comes once for each of them.
+
+        The patterns are matched together in a single walk, so that each
+        directory is read only once.  See glob() for the keyword
+        arguments.
+        """
+        patterns = list(patterns)
+        all_parts = []
+        for pattern in patterns:
+            sys.audit("pathlib.Path.glob", self, pattern)
+            if not pattern:
+                raise ValueError("Unacceptable pattern: {!r}".format(pattern))
+            drv, root, pattern_parts = self._flavour.parse_parts((pattern,))
+            if drv or root:
+                raise NotImplementedError("Non-relative patterns are unsupported")
+            all_parts.append(tuple(pattern_parts))
+        if not all_parts:
+            return
+        selector = _make_multi_selector(tuple(all_parts), self._flavour)
+        exclude = _make_exclude(exclude, type(self))
+        for item in selector.select_from(self, stream, breadth_first, workers,
+                                         ordered, exclude, max_depth,
+                                         limit, keep_entries):
+            yield item
+
+    def glob_any(self, pattern, *, breadth_first=False, workers=None,
+                 exclude=None, max_depth=None):
+        """Return True if any existing file matches the given relative
+        pattern, stopping at the first match.  See glob() for the keyword
+        arguments.
+        """
+        it = self.glob(pattern, breadth_first=breadth_first, workers=workers,
+                       exclude=exclude, max_depth=max_depth, limit=1)
+        try:
+            return next(it, None) is not None
+        finally:
+            it.close()
+
     def absolute(self):
         """Return an absolute version of this path by prepending the current
         working directory. No normalization or symlink resolution is performed.
@@ -1023,7 +1991,10 @@ class Path(PurePath):
         Return the result of the stat() system call on this path, like
         os.stat() does.
         """
-        return os.stat(self, follow_symlinks=follow_symlinks)
+        entry = self._dir_entry if self._lazy_parent is not None else None
+        if entry is None:
+            return os.stat(self, follow_symlinks=follow_symlinks)
+        return entry.stat(follow_symlinks=follow_symlinks)
 
     def owner(self):
         """
@@ -1244,8 +2215,11 @@ class Path(PurePath):
         """
         Whether this path exists.
         """
+        entry = self._dir_entry if self._lazy_parent is not None else None
         try:
-            self.stat()
+            # Only symlinks read from a listing may not exist.
+            if entry is None or entry.is_symlink():
+                self.stat()
         except OSError as e:
             if not _ignore_error(e):
                 raise
@@ -1259,7 +2233,10 @@ class Path(PurePath):
         """
         Whether this path is a directory.
         """
+        entry = self._dir_entry if self._lazy_parent is not None else None
         try:
+            if entry is not None:
+                return entry.is_dir()
             return S_ISDIR(self.stat().st_mode)
         except OSError as e:
             if not _ignore_error(e):
@@ -1276,7 +2253,10 @@ class Path(PurePath):
         Whether this path is a regular file (also True for symlinks pointing
         to regular files).
         """
+        entry = self._dir_entry if self._lazy_parent is not None else None
         try:
+            if entry is not None:
+                return entry.is_file()
             return S_ISREG(self.stat().st_mode)
         except OSError as e:
             if not _ignore_error(e):
@@ -1312,7 +2292,10 @@ class Path(PurePath):
         """
         Whether this path is a symbolic link.
         """
+        entry = self._dir_entry if self._lazy_parent is not None else None
         try:
+            if entry is not None:
+                return entry.is_symlink()
             return S_ISLNK(self.lstat().st_mode)
         except OSError as e:
             if not _ignore_error(e):
@@ -1415,5 +2398,611 @@ class WindowsPath(Path, PureWindowsPath):
     """
     __slots__ = ()
 
+    def stat(self, *, follow_symlinks=True):
+        # The stat() of a DirEntry reports st_ino, st_dev and st_nlink as
+        # zero on Windows, which would fool samefile().
+        return os.stat(self, follow_symlinks=follow_symlinks)
+
     def is_mount(self):
-        raise NotImplementedError("Path.is_mount() is unsupported on this system")
\ No newline at end of file
+        raise NotImplementedError("Path.is_mount() is unsupported on this system")
+
+
+class PathPool(object):
+    """A pool of canonical path instances.
+
+    Interning equal paths through the same pool makes them share a single
+    object, along with its cached string and hash.  Paths are only held
+    weakly, so they leave the pool once no longer referenced elsewhere.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._paths = weakref.WeakValueDictionary()
+
+    def intern(self, path):
+        """Return the pooled path equal to *path*, which must be of the same
+        type, adding *path* to the pool if there is none."""
+        key = (type(path), tuple(path._cparts))
+        with self._lock:
+            return self._paths.setdefault(key, path)
+
+    def clear(self):
+        """Remove all paths from the pool."""
+        with self._lock:
+            self._paths.clear()
+
+    def __len__(self):
+        return len(self._paths)
+
+
+_path_pool = PathPool()
+
+
+def _resolve_path_class(pathcls):
+    # Pick the concrete class for PurePath and Path, like their
+    # constructors do, and refuse concrete classes foreign to this system.
+    if pathcls is None or pathcls is PurePath:
+        pathcls = PureWindowsPath if os.name == 'nt' else PurePosixPath
+    elif pathcls is Path:
+        pathcls = WindowsPath if os.name == 'nt' else PosixPath
+    if issubclass(pathcls, Path) and not pathcls._flavour.is_supported:
+        raise NotImplementedError("cannot instantiate %r on your system"
+                                  % (pathcls.__name__,))
+    return pathcls
+
+
+class PathArray(Sequence):
+    """A read-only sequence of pure paths stored column-wise.
+
+    The paths are normalized and concatenated into a single string, along
+    with arrays of offsets marking where each path, its anchor and its
+    final component start.  Properties such as name or suffix and the
+    match() method work on the whole array at once and return lists,
+    without creating a path object per element; indexing or iterating
+    does create them.
+    """
+
+    def __init__(self, paths=(), pathcls=None):
+        pathcls = _resolve_path_class(pathcls)
+        self._pathcls = pathcls
+        flavour = pathcls._flavour
+        sep = flavour.sep
+        altsep = flavour.altsep
+        is_canonical = flavour.is_canonical
+        splitroot = flavour.splitroot
+        pieces = []
+        starts = array('q')
+        ends = array('q')
+        anchor_ends = array('q')
+        name_starts = array('q')
+        offset = 0
+        for a in paths:
+            if type(a) is not str:
+                if isinstance(a, PurePath) and a._flavour is flavour:
+                    a = str(a)
+                else:
+                    a = os.fspath(a)
+                    if not isinstance(a, str):
+                        raise TypeError(
+                            "argument should be a str object or an "
+                            "os.PathLike object returning str, not %r"
+                            % type(a))
+                    a = str(a)
+            if altsep:
+                a = a.replace(altsep, sep)
+            if is_canonical(a):
+                if a == '.':
+                    a = ''
+                drv, root, _ = splitroot(a)
+            else:
+                drv, root, parts = pathcls._parse_str(a)
+                a = pathcls._format_parsed_parts(drv, root, parts)
+            anchor_end = offset + len(drv) + len(root)
+            end = offset + len(a)
+            pieces.append(a)
+            starts.append(offset)
+            ends.append(end)
+            anchor_ends.append(anchor_end)
+            name_starts.append(max(anchor_end, offset + a.rfind(sep) + 1))
+            offset = end
+        self._buffer = ''.join(pieces)
+        self._starts = starts
+        self._ends = ends
+        self._anchor_ends = anchor_ends
+        self._name_starts = name_starts
+
+    @classmethod
+    def _from_columns(cls, pathcls, buffer, starts, ends, anchor_ends,
+                      name_starts):
+        self = object.__new__(cls)
+        self._pathcls = pathcls
+        self._buffer = buffer
+        self._starts = starts
+        self._ends = ends
+        self._anchor_ends = anchor_ends
+        self._name_starts = name_starts
+        return self
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return self._from_columns(
+                self._pathcls, self._buffer, self._starts[idx],
+                self._ends[idx], self._anchor_ends[idx],
+                self._name_starts[idx])
+        s = self._buffer[self._starts[idx]:self._ends[idx]]
+        return self._pathcls._from_parts((s,))
+
+    def __repr__(self):
+        return "{}({!r}, {})".format(
+            self.__class__.__name__, [p.as_posix() for p in self],
+            self._pathcls.__name__)
+
+    @property
+    def name(self):
+        """A list of the final component of each path."""
+        buffer = self._buffer
+        return [buffer[i:j] for i, j in zip(self._name_starts, self._ends)]
+
+    @property
+    def suffix(self):
+        """A list of the final component's last suffix of each path."""
+        result = []
+        for name in self.name:
+            i = name.rfind('.')
+            result.append(name[i:] if 0 < i < len(name) - 1 else '')
+        return result
+
+    @property
+    def stem(self):
+        """A list of the final component of each path, minus its last
+        suffix."""
+        result = []
+        for name in self.name:
+            i = name.rfind('.')
+            result.append(name[:i] if 0 < i < len(name) - 1 else name)
+        return result
+
+    @property
+    def parent(self):
+        """A PathArray of the logical parent of each path."""
+        buffer = self._buffer
+        sep = self._pathcls._flavour.sep
+        ends = array('q')
+        name_starts = array('q')
+        for anchor_end, name_start in zip(self._anchor_ends,
+                                          self._name_starts):
+            end = name_start - 1 if name_start > anchor_end else anchor_end
+            ends.append(end)
+            name_starts.append(buffer.rfind(sep, anchor_end, end) + 1
+                               or anchor_end)
+        return self._from_columns(self._pathcls, buffer, self._starts, ends,
+                                  self._anchor_ends, name_starts)
+
+    def match(self, path_pattern):
+        """Return a list of booleans telling whether each path matches
+        the given pattern, as PurePath.match() does."""
+        match_parts = PathPattern(path_pattern, self._pathcls)._match_parts
+        flavour = self._pathcls._flavour
+        splitroot = flavour.splitroot
+        casefold_parts = flavour.casefold_parts
+        buffer = self._buffer
+        sep = flavour.sep
+        result = []
+        for start, anchor_end, end in zip(self._starts, self._anchor_ends,
+                                          self._ends):
+            anchor = buffer[start:anchor_end]
+            rel = buffer[anchor_end:end]
+            parts = rel.split(sep) if rel else []
+            if anchor:
+                parts.insert(0, anchor)
+                drv, root, _ = splitroot(anchor)
+            else:
+                drv = root = ''
+            result.append(match_parts(drv, root, casefold_parts(parts)))
+        return result
+
+
+class PathTrie(MutableSet):
+    """A mutable set of paths stored as a tree of their components.
+
+    Besides the usual set operations, it answers which stored path is the
+    closest ancestor of a given path, and iterates over or removes all
+    stored paths under a directory, in time proportional to the depth of
+    the path.  Components are compared as the path flavour does, so
+    Windows paths are case-insensitive.  Arguments that are not paths are
+    converted with *pathcls*.
+    """
+
+    # Key holding the stored path in its node; components are never None.
+    _VALUE = None
+
+    def __init__(self, paths=(), pathcls=None):
+        self._pathcls = _resolve_path_class(pathcls)
+        self._root = {}
+        self._len = 0
+        for path in paths:
+            self.add(path)
+
+    def _from_iterable(self, it):
+        # Results of the set operators keep our path class.
+        return type(self)(it, self._pathcls)
+
+    def _key(self, path):
+        if not isinstance(path, PurePath):
+            path = self._pathcls(path)
+        # Paths of different flavours never compare equal, so each flavour
+        # gets its own subtree, under which relative paths are kept apart
+        # from anchored ones by an empty anchor.
+        if path.drive or path.root:
+            return path, [path._flavour] + path._cparts
+        return path, [path._flavour, ''] + path._cparts
+
+    def _find(self, key):
+        node = self._root
+        for part in key:
+            node = node.get(part)
+            if node is None:
+                return None
+        return node
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, path):
+        try:
+            key = self._key(path)[1]
+        except TypeError:
+            # Not a path, so not a member, as with a set.
+            return False
+        node = self._find(key)
+        return node is not None and self._VALUE in node
+
+    def __iter__(self):
+        return self._iter_node(self._root)
+
+    def _iter_node(self, node):
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if self._VALUE in node:
+                yield node[self._VALUE]
+            stack.extend(child for part, child in reversed(node.items())
+                         if part is not self._VALUE)
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, list(self))
+
+    def add(self, path):
+        """Add a path to the set."""
+        path, key = self._key(path)
+        node = self._root
+        for part in key:
+            node = node.setdefault(part, {})
+        if self._VALUE not in node:
+            self._len += 1
+            node[self._VALUE] = path
+
+    def discard(self, path):
+        """Remove a path from the set if it is a member."""
+        self._prune(self._key(path)[1], subtree=False)
+
+    def discard_subtree(self, path):
+        """Remove the given path and every path under it from the set.
+        Return the number of paths removed."""
+        return self._prune(self._key(path)[1], subtree=True)
+
+    def _prune(self, key, subtree):
+        nodes = [self._root]
+        for part in key:
+            node = nodes[-1].get(part)
+            if node is None:
+                return 0
+            nodes.append(node)
+        node = nodes[-1]
+        if subtree:
+            removed = sum(1 for _ in self._iter_node(node))
+            node.clear()
+        elif self._VALUE in node:
+            removed = 1
+            del node[self._VALUE]
+        else:
+            return 0
+        self._len -= removed
+        # Drop the nodes left empty, bottom up.
+        for parent, part in zip(reversed(nodes[:-1]), reversed(key)):
+            if parent[part]:
+                break
+            del parent[part]
+        return removed
+
+    def clear(self):
+        """Remove all paths from the set."""
+        self._root.clear()
+        self._len = 0
+
+    def longest_prefix(self, path):
+        """Return the deepest member that is the given path or one of its
+        ancestors, or None if there is none."""
+        node = self._root
+        found = None
+        for part in self._key(path)[1]:
+            node = node.get(part)
+            if node is None:
+                break
+            found = node.get(self._VALUE, found)
+        return found
+
+    def subtree(self, path):
+        """Iterate over the members that are the given path or lie under
+        it."""
+        node = self._find(self._key(path)[1])
+        if node is None:
+            return iter(())
+        return self._iter_node(node)
+
+
+class PathPattern(object):
+    """A pattern compiled for matching paths, as PurePath.match() does,
+    or as PurePath.full_match() does if *full* is true.
+
+    Compiling a pattern once saves parsing it again for each path.
+    Components without wildcards are compared as plain strings, and
+    components such as '*.log' or 'test_*' as suffixes or prefixes;
+    other components use a regular expression.  In full mode, the whole
+    path after its anchor is matched by a single regular expression.
+    """
+
+    def __init__(self, pattern, pathcls=None, full=False):
+        pathcls = _resolve_path_class(pathcls)
+        flavour = pathcls._flavour
+        self.pattern = pattern
+        self.full = full
+        self._pathcls = pathcls
+        cf = flavour.casefold
+        self._casefold = cf
+        drv, root, pat_parts = flavour.parse_parts((cf(pattern),))
+        if not pat_parts:
+            raise ValueError("empty pattern")
+        self._drv = drv
+        self._root = root
+        self._nparts = len(pat_parts)
+        if drv or root:
+            self._anchor = pat_parts[0]
+            pat_parts = pat_parts[1:]
+        else:
+            self._anchor = ''
+        self._pat_parts = pat_parts
+        if full:
+            self._sep = flavour.sep
+            self._regex = re.compile(
+                _translate_full_pattern(pat_parts, flavour.sep))
+        else:
+            self._matchers = [_make_part_matcher(pat)
+                              for pat in reversed(pat_parts)]
+
+    def __repr__(self):
+        if self.full:
+            return "{}({!r}, {}, full=True)".format(
+                self.__class__.__name__, self.pattern, self._pathcls.__name__)
+        return "{}({!r}, {})".format(self.__class__.__name__, self.pattern,
+                                     self._pathcls.__name__)
+
+    def match(self, path):
+        """Return True if the given path matches this pattern."""
+        if not (isinstance(path, PurePath) and
+                path._flavour is self._pathcls._flavour):
+            path = self._pathcls._from_parts((path,))
+        return self._match_parts(path.drive, path.root, path._cparts)
+
+    def filter(self, paths):
+        """Iterate over the items of *paths* that match this pattern."""
+        match = self.match
+        for path in paths:
+            if match(path):
+                yield path
+
+    def _match_parts(self, drv, root, parts):
+        # *parts* are casefolded, with the anchor as their first item.
+        if self.full:
+            if drv or root:
+                return (parts[0] == self._anchor and
+                        self._regex.fullmatch(self._sep.join(parts[1:]))
+                        is not None)
+            return (not self._anchor and
+                    self._regex.fullmatch(self._sep.join(parts)) is not None)
+        pat_drv = self._drv
+        pat_root = self._root
+        if pat_drv and pat_drv != self._casefold(drv):
+            return False
+        if pat_root and pat_root != self._casefold(root):
+            return False
+        if pat_drv or pat_root:
+            if self._nparts != len(parts):
+                return False
+        elif self._nparts > len(parts):
+            return False
+        for part, matcher in zip(reversed(parts), self._matchers):
+            if matcher is not None and not matcher(part):
+                return False
+        return True
+
+
+def _make_part_matcher(pat):
+    # Return a callable telling whether a single (casefolded) component
+    # matches the given fnmatch-style pattern, or None if anything does.
+    if pat == '*':
+        return None
+    if not _is_wildcard_pattern(pat):
+        return pat.__eq__
+    if '?' not in pat and '[' not in pat and pat.count('*') == 1:
+        if pat[0] == '*':
+            suffix = pat[1:]
+            return lambda part: part.endswith(suffix)
+        if pat[-1] == '*':
+            prefix = pat[:-1]
+            return lambda part: part.startswith(prefix)
+    return re.compile(fnmatch.translate(pat)).match
+
+
+def _translate_full_pattern(pat_parts, sep):
+    # Translate the components of a full_match() pattern, after its anchor,
+    # into a regular expression matching the rest of a casefolded path.
+    sep = re.escape(sep)
+    res = []
+    need_sep = False
+    for i, pat in enumerate(pat_parts):
+        if pat == '**':
+            if need_sep:
+                res.append('(?:%s.+)?' % sep)
+            elif i == len(pat_parts) - 1:
+                res.append('.*')
+            else:
+                res.append('(?:.+%s)?' % sep)
+            continue
+        if need_sep:
+            res.append(sep)
+        need_sep = True
+        j, n = 0, len(pat)
+        while j < n:
+            c = pat[j]
+            j += 1
+            if c == '*':
+                res.append('[^%s]*' % sep)
+            elif c == '?':
+                res.append('[^%s]' % sep)
+            elif c == '[':
+                k = _set_end(pat, j)
+                if k < 0:
+                    res.append('\\[')
+                    continue
+                # A set never matches the separator.
+                res.append(_translate_set(pat[j:k], '(?!%s)' % sep))
+                j = k + 1
+            else:
+                res.append(re.escape(c))
+    return '(?s:%s)' % ''.join(res)
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_path_pattern(pattern, pathcls, full=False):
+    return PathPattern(pattern, pathcls, full)
+
+
+class PatternSet(object):
+    """A list of patterns compiled for matching paths against all of them.
+
+    Patterns are indexed by their last component: literal names, suffixes
+    such as '*.log' and prefixes such as 'test_*' are looked up in
+    dictionaries, and other wildcard components are tried only when a
+    regular expression combining them all matches.  Only the patterns
+    selected that way are then checked in full, so the cost per path
+    barely depends on the number of patterns.
+    """
+
+    def __init__(self, patterns, pathcls=None):
+        pathcls = _resolve_path_class(pathcls)
+        self._pathcls = pathcls
+        self.patterns = []
+        self._compiled = []
+        self._always = []
+        self._literals = {}
+        suffixes = {}
+        prefixes = {}
+        wildcards = {}
+        for index, pattern in enumerate(patterns):
+            compiled = PathPattern(pattern, pathcls)
+            self.patterns.append(pattern)
+            self._compiled.append(compiled)
+            last = compiled._pat_parts[-1] if compiled._pat_parts else '*'
+            if last == '*':
+                self._always.append(index)
+            elif not _is_wildcard_pattern(last):
+                self._literals.setdefault(last, []).append(index)
+            elif ('?' not in last and '[' not in last and
+                    last.count('*') == 1 and last[0] == '*'):
+                suffix = last[1:]
+                suffixes.setdefault(len(suffix), {}).setdefault(
+                    suffix, []).append(index)
+            elif ('?' not in last and '[' not in last and
+                    last.count('*') == 1 and last[-1] == '*'):
+                prefix = last[:-1]
+                prefixes.setdefault(len(prefix), {}).setdefault(
+                    prefix, []).append(index)
+            else:
+                wildcards.setdefault(last, []).append(index)
+        self._suffixes = sorted(suffixes.items())
+        self._prefixes = sorted(prefixes.items())
+        self._wildcards = [(re.compile(fnmatch.translate(pat)).match, indices)
+                           for pat, indices in wildcards.items()]
+        if wildcards:
+            self._any_wildcard = re.compile('|'.join(
+                fnmatch.translate(pat) for pat in wildcards)).match
+        else:
+            self._any_wildcard = None
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def __repr__(self):
+        return "{}({!r}, {})".format(self.__class__.__name__, self.patterns,
+                                     self._pathcls.__name__)
+
+    def _candidates(self, path):
+        # Return the path, converted if needed, along with the sorted
+        # indices of the patterns whose last component matches its own.
+        if not (isinstance(path, PurePath) and
+                path._flavour is self._pathcls._flavour):
+            path = self._pathcls._from_parts((path,))
+        cparts = path._cparts
+        candidates = list(self._always)
+        if cparts:
+            last = cparts[-1]
+            indices = self._literals.get(last)
+            if indices:
+                candidates += indices
+            size = len(last)
+            for n, table in self._suffixes:
+                if n > size:
+                    break
+                indices = table.get(last[size - n:])
+                if indices:
+                    candidates += indices
+            for n, table in self._prefixes:
+                if n > size:
+                    break
+                indices = table.get(last[:n])
+                if indices:
+                    candidates += indices
+            if self._any_wildcard is not None and self._any_wildcard(last):
+                for match, indices in self._wildcards:
+                    if match(last):
+                        candidates += indices
+        candidates.sort()
+        return path, candidates
+
+    def matches(self, path):
+        """Return the list of indices of the patterns matching the given
+        path, in increasing order."""
+        path, candidates = self._candidates(path)
+        drv, root, cparts = path.drive, path.root, path._cparts
+        compiled = self._compiled
+        return [index for index in candidates
+                if compiled[index]._match_parts(drv, root, cparts)]
+
+    def first_match(self, path):
+        """Return the index of the first pattern matching the given path,
+        or None if no pattern matches."""
+        path, candidates = self._candidates(path)
+        drv, root, cparts = path.drive, path.root, path._cparts
+        compiled = self._compiled
+        for index in candidates:
+            if compiled[index]._match_parts(drv, root, cparts):
+                return index
+        return None
+
+    def match(self, path):
+        """Return True if any pattern matches the given path."""
+        return self.first_match(path) is not None
@@ -1,6 +1,8 @@
 import collections.abc
 import contextlib
 import errno
+import fnmatch
+import gc
 import io
 import os
 import pickle
@@ -9,6 +11,7 @@ import stat
 import sys
 import tempfile
 import unittest
+import warnings
 from unittest import mock
 
 import pathlib2 as pathlib
@@ -64,6 +67,21 @@ class _BaseFlavourTest:
         check(['a', '/b', 'c'],     ('', sep, [sep, 'b', 'c']))
         check(['a', '/b', '/c'],    ('', sep, [sep, 'c']))
 
+    def test_is_canonical_common(self):
+        f = self.flavour.is_canonical
+        sep = self.flavour.sep
+        for s in ['a', 'a/b', '/a/b', '/', '.', '..', '../a', 'a/..', '.a']:
+            self.assertTrue(f(s.replace('/', sep)), s)
+        for s in ['', 'a/', 'a//b', './a', 'a/.', 'a/./b', '/.', '///a']:
+            self.assertFalse(f(s.replace('/', sep)), s)
+
+    def test_is_plain_name_common(self):
+        f = self.flavour.is_plain_name
+        for s in ['a', '..', '.a', 'a.b', ' ']:
+            self.assertTrue(f(s), s)
+        for s in ['', '.', 'a/b', '/a', 'a/']:
+            self.assertFalse(f(s.replace('/', self.flavour.sep)), s)
+
 
 class PosixFlavourTest(_BaseFlavourTest, unittest.TestCase):
     flavour = pathlib._posix_flavour
@@ -162,6 +180,69 @@ class NTFlavourTest(_BaseFlavourTest, unittest.TestCase):
         self.assertEqual(f('\\\\\\a\\b'), ('', '\\', 'a\\b'))
         self.assertEqual(f('\\\\a'), ('', '\\', 'a'))
 
+    def test_is_canonical(self):
+        f = self.flavour.is_canonical
+        self.assertTrue(f('c:'))
+        self.assertTrue(f('c:a'))
+        self.assertTrue(f('c:\\a'))
+        self.assertTrue(f('\\\\a\\b\\'))
+        self.assertTrue(f('\\\\?\\c:\\a'))
+        self.assertFalse(f('c:/a'))
+        self.assertFalse(f('c:.'))
+        self.assertFalse(f('c:\\\\a'))
+        self.assertFalse(f('\\\\a\\b'))
+        self.assertFalse(f('\\\\a\\b\\\\x'))
+        self.assertFalse(f('\\\\a\\b\\\\'))
+        self.assertFalse(f('\\\\?\\\\\\c:\\a'))
+
+    def test_is_plain_name(self):
+        f = self.flavour.is_plain_name
+        self.assertFalse(f('c:'))
+        self.assertFalse(f('c:a'))
+        self.assertFalse(f('a/b'))
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.parse_cache_clear()
+        pathlib.set_parse_cache_size(2)
+        self.addCleanup(pathlib.set_parse_cache_size, 0)
+        self.addCleanup(pathlib.parse_cache_clear)
+
+    def test_hits_and_misses(self):
+        P = pathlib.PurePosixPath
+        self.assertEqual(P('/a/b').parts, ('/', 'a', 'b'))
+        self.assertEqual(P('/a/b').parts, ('/', 'a', 'b'))
+        self.assertEqual(pathlib.parse_cache_info(), (1, 1, 2, 1))
+        # The same string is parsed separately for each flavour.
+        self.assertEqual(pathlib.PureWindowsPath('/a/b').parts, ('\\', 'a', 'b'))
+        self.assertEqual(pathlib.parse_cache_info(), (1, 2, 2, 2))
+
+    def test_eviction(self):
+        def P(s):
+            return pathlib.PurePosixPath(s).parts
+        P('a'), P('b'), P('a'), P('c')
+        info = pathlib.parse_cache_info()
+        self.assertEqual((info.hits, info.currsize), (1, 2))
+        P('a')
+        self.assertEqual(pathlib.parse_cache_info().hits, 2)
+        P('b')
+        self.assertEqual(pathlib.parse_cache_info().hits, 2)
+
+    def test_resize_and_clear(self):
+        def P(s):
+            return pathlib.PurePosixPath(s).parts
+        P('a'), P('b')
+        pathlib.set_parse_cache_size(1)
+        self.assertEqual(pathlib.parse_cache_info().currsize, 1)
+        pathlib.parse_cache_clear()
+        self.assertEqual(pathlib.parse_cache_info(), (0, 0, 1, 0))
+        pathlib.set_parse_cache_size(0)
+        P('a'), P('a')
+        self.assertEqual(pathlib.parse_cache_info(), (0, 0, 0, 0))
+        self.assertRaises(ValueError, pathlib.set_parse_cache_size, -1)
+
 
 #
 # Tests for the pure classes.
@@ -225,6 +306,142 @@ class _BasePurePathTest:
         self._check_str_subclass('a/b.txt')
         self._check_str_subclass('/a/b.txt')
 
+    def test_lazy_parsing_common(self):
+        P = self.cls
+        p = P('a' + self.sep + 'b')
+        self.assertIsNone(p._cached_parts)
+        self.assertEqual(str(p), 'a' + self.sep + 'b')
+        self.assertIsNone(p._cached_parts)
+        self.assertEqual(p.parts, ('a', 'b'))
+        self.assertEqual(p, P('a', 'b'))
+        self.assertEqual(p._cached_parts, ['a', 'b'])
+        # The drive and root are known without parsing the parts.
+        p = P(self.sep + 'a')
+        self.assertEqual((p.drive, p.root, p.anchor), ('', self.sep, self.sep))
+        self.assertIsNone(p._cached_parts)
+
+    def test_child_path_common(self):
+        P = self.cls
+        p = P('a')
+        q = p / 'b' / 'c'
+        self.assertIsNone(q._cached_parts)
+        self.assertIs(q.parent.parent, p)
+        self.assertEqual(q.name, 'c')
+        self.assertIsNone(q._cached_parts)
+        self.assertEqual(q.parts, ('a', 'b', 'c'))
+        self.assertEqual(q.parent._parts, ['a', 'b'])
+        self.assertEqual(list(q.parents), [P('a/b'), P('a'), P()])
+        self.assertEqual(q, P('a/b/c'))
+        self.assertEqual(hash(q), hash(P('a/b/c')))
+        self.assertLess(q, P('a/b/d'))
+        self.assertEqual(str(P('/') / 'a'), self.sep + 'a')
+        self.assertEqual(str(P() / 'a'), 'a')
+        q = P(self.sep) / 'a' / 'b'
+        self.assertEqual((q.drive, q.root, q.name), ('', self.sep, 'b'))
+        self.assertIsNone(q._cached_parts)
+        # Deep chains are resolved without recursion.
+        q = P('/')
+        for i in range(sys.getrecursionlimit() + 100):
+            q = q / 'd'
+        self.assertEqual(len(q.parts), sys.getrecursionlimit() + 101)
+
+    def test_intern_common(self):
+        P = self.cls
+        pool = pathlib.PathPool()
+        p = pool.intern(P('a/b'))
+        self.assertIs(pool.intern(P('a', 'b')), p)
+        self.assertIs(pool.intern(P('a//b/')), p)
+        self.assertIsNot(pool.intern(P('a/c')), p)
+        self.assertEqual(len(pool), 1)
+        q = P('/a/b')
+        self.assertIs(pool.intern(q), q)
+        self.assertEqual(len(pool), 2)
+        del p, q
+        gc.collect()
+        self.assertEqual(len(pool), 0)
+        pool.intern(P('a'))
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+        p = P('x/y').intern()
+        self.assertIs(P('x', 'y').intern(), p)
+
+    def test_from_strings_common(self):
+        P = self.cls
+        strings = ['', '.', 'a', 'a/b', '/a/b', 'a//b/', './a', 'a/./b',
+                   '//a/b', '///a', 'a/b/c', 'a/b/d', FakePath('a/b')]
+        paths = list(P.from_strings(strings))
+        self.assertEqual(len(paths), len(strings))
+        for s, p in zip(strings, paths):
+            self.assertIs(type(p), type(P(s)))
+            self.assertEqual(p, P(s))
+            self.assertEqual(str(p), str(P(s)))
+            self.assertEqual(p.parts, P(s).parts)
+        it = P.from_strings(iter(['a']))
+        self.assertIsInstance(it, collections.abc.Iterator)
+        self.assertEqual(list(it), [P('a')])
+        with self.assertRaises(TypeError):
+            list(P.from_strings(['a', b'b']))
+
+    def test_path_array_common(self):
+        P = self.cls
+        strings = ['', 'a', 'a/b.py', '/a/b', 'a//b/', './a/.c', '/',
+                   '..', 'x/y.tar.gz', FakePath('a/b')]
+        expected = [P(s) for s in strings]
+        arr = pathlib.PathArray(strings, P)
+        self.assertEqual(len(arr), len(strings))
+        self.assertEqual(list(arr), expected)
+        self.assertIs(type(arr[0]), type(expected[0]))
+        self.assertEqual(arr[-1], expected[-1])
+        self.assertEqual(list(arr[2:4]), expected[2:4])
+        self.assertEqual(arr.name, [p.name for p in expected])
+        self.assertEqual(arr.suffix, [p.suffix for p in expected])
+        self.assertEqual(arr.stem, [p.stem for p in expected])
+        self.assertEqual(list(arr.parent), [p.parent for p in expected])
+        self.assertEqual(list(arr.parent.parent),
+                         [p.parent.parent for p in expected])
+        self.assertEqual(arr.parent.name, [p.parent.name for p in expected])
+        for pattern in ['a', '*.py', 'b', '*/b', '/a/*', '/*', '*', 'a/*']:
+            self.assertEqual(arr.match(pattern),
+                             [p.match(pattern) for p in expected])
+        self.assertRaises(ValueError, arr.match, '')
+        self.assertEqual(list(pathlib.PathArray([], P)), [])
+        with self.assertRaises(TypeError):
+            pathlib.PathArray([b'a'], P)
+
+    def test_path_trie_common(self):
+        P = self.cls
+        trie = pathlib.PathTrie(['/a', '/a/b', P('/a/b/c'), 'x', ''], P)
+        self.assertEqual(len(trie), 5)
+        self.assertIn(P('/a/b'), trie)
+        self.assertIn('x/', trie)
+        self.assertNotIn('/a/b/c/d', trie)
+        self.assertNotIn('/', trie)
+        trie.add('/a/b')
+        self.assertEqual(len(trie), 5)
+        self.assertEqual(trie.longest_prefix('/a/b/z'), P('/a/b'))
+        self.assertEqual(trie.longest_prefix('/a/b/c'), P('/a/b/c'))
+        self.assertEqual(trie.longest_prefix('x/y'), P('x'))
+        # The empty path is an ancestor of relative paths only.
+        self.assertEqual(trie.longest_prefix('y'), P())
+        self.assertIsNone(trie.longest_prefix('/z'))
+        self.assertEqual(sorted(trie.subtree('/a/b')),
+                         [P('/a/b'), P('/a/b/c')])
+        self.assertEqual(list(trie.subtree('/z')), [])
+        self.assertEqual(trie.discard_subtree('/a/b'), 2)
+        self.assertEqual(trie.discard_subtree('/a/b'), 0)
+        self.assertEqual(len(trie), 3)
+        self.assertEqual(trie.longest_prefix('/a/b/z'), P('/a'))
+        trie.discard('/a')
+        trie.discard('/a')
+        self.assertEqual(sorted(trie), [P(), P('x')])
+        self.assertRaises(KeyError, trie.remove, '/a')
+        self.assertNotIn(None, trie)
+        self.assertTrue(trie.isdisjoint([None, 1]))
+        self.assertNotEqual(trie, {None})
+        trie.clear()
+        self.assertEqual(len(trie), 0)
+        self.assertEqual(list(trie), [])
+
     def test_join_common(self):
         P = self.cls
         p = P('a/b')
@@ -256,6 +473,14 @@ class _BasePurePathTest:
         pp = p/ '/c'
         self.assertEqual(pp, P('/c'))
 
+    def test_div_plain_name_common(self):
+        P = self.cls
+        for base in [P(), P('a/b'), P('/a'), P('/')]:
+            for name in ['c', '..', '.c', 'c.txt', '', '.', 'c/d', 'c/']:
+                self.assertEqual(base / name, P(base, name))
+                self.assertEqual(str(base / name), str(P(base, name)))
+                self.assertEqual(base.joinpath(name), P(base, name))
+
     def _check_str(self, expected, args):
         p = self.cls(*args)
         self.assertEqual(str(p), expected.replace('/', self.sep))
@@ -689,6 +914,141 @@ class _BasePurePathTest:
         self.assertFalse(p.is_relative_to(''))
         self.assertFalse(p.is_relative_to(P('a')))
 
+    def test_relative_to_many_common(self):
+        P = self.cls
+        base = P('/a')
+        paths = [P('/a/b'), '/a/b/c', P('/a'), FakePath('/a/d/')]
+        result = base.relative_to_many(paths)
+        self.assertIsInstance(result, collections.abc.Iterator)
+        result = list(result)
+        self.assertEqual(result, [P('b'), P('b/c'), P(), P('d')])
+        self.assertEqual(result, [P(p).relative_to(base) for p in paths])
+        self.assertIs(type(result[1]), type(base))
+        self.assertEqual(list(P().relative_to_many(['a', 'b/c'])),
+                         [P('a'), P('b/c')])
+        with self.assertRaises(ValueError):
+            list(base.relative_to_many(['/a/b', '/c']))
+        with self.assertRaises(ValueError):
+            list(base.relative_to_many(['a']))
+
+    def test_common_ancestor_common(self):
+        P = self.cls
+        self.assertEqual(P.common_ancestor('/a/b/c', P('/a/b/d'), '/a/bb'),
+                         P('/a'))
+        self.assertEqual(P.common_ancestor(['a/b', 'a/b/c']), P('a/b'))
+        self.assertEqual(P.common_ancestor(iter([P('a/b')])), P('a/b'))
+        self.assertEqual(P.common_ancestor('a', 'b'), P())
+        self.assertEqual(P.common_ancestor('/a', '/b'), P('/'))
+        self.assertEqual(P.common_ancestor(FakePath('a/b'), 'a//c'), P('a'))
+        self.assertIs(type(P.common_ancestor('a')), type(P('a')))
+        self.assertRaises(ValueError, P.common_ancestor)
+        self.assertRaises(ValueError, P.common_ancestor, [])
+        self.assertRaises(ValueError, P.common_ancestor, 'a', '/a')
+        self.assertRaises(ValueError, P.common_ancestor, '/a', 'b', 'a')
+        self.assertRaises(TypeError, P.common_ancestor, 'a', b'a')
+
+    def test_path_pattern_common(self):
+        P = self.cls
+        paths = ['a', 'a/b.py', '/a/b.py', 'c/test_x.py', 'x.log', '/',
+                 FakePath('a/b.log')]
+        for pattern in ['a', '*.py', 'test_*', '/a/*', '*', 'a/*',
+                        '*/b.[lp]*', 'a?b', 'a/b.py']:
+            pat = pathlib.PathPattern(pattern, P)
+            self.assertEqual(pat.pattern, pattern)
+            for path in paths:
+                self.assertEqual(pat.match(path), P(path).match(pattern),
+                                 (path, pattern))
+                self.assertEqual(pat.match(P(path)), P(path).match(pattern))
+        pat = pathlib.PathPattern('*.py', P)
+        result = pat.filter(paths)
+        self.assertIsInstance(result, collections.abc.Iterator)
+        self.assertEqual(list(result), ['a/b.py', '/a/b.py', 'c/test_x.py'])
+        self.assertRaises(ValueError, pathlib.PathPattern, '', P)
+        self.assertRaises(TypeError, pat.match, b'a.py')
+
+    def test_pattern_set_common(self):
+        P = self.cls
+        patterns = ['a', '*', '*.py', 'a*', '/a/*', 'b/*.py', '*/b',
+                    'a?c', '[ab]*', 'test_*', '*.tar.gz', '*.gz', 'b.py']
+        patset = pathlib.PatternSet(patterns, P)
+        self.assertEqual(len(patset), len(patterns))
+        self.assertEqual(patset.patterns, patterns)
+        for path in ['', 'a', 'abc', '/a/b.py', 'a/b.py', 'x/b', 'f.tar.gz',
+                     '/', 'test_q', 'q/test_', FakePath('b')]:
+            expected = [i for i, pattern in enumerate(patterns)
+                        if P(path).match(pattern)]
+            self.assertEqual(patset.matches(path), expected, path)
+            self.assertEqual(patset.matches(P(path)), expected)
+            self.assertEqual(patset.first_match(path),
+                             expected[0] if expected else None)
+            self.assertIs(patset.match(path), bool(expected))
+        patset = pathlib.PatternSet(['*.py', 'x'], P)
+        self.assertEqual(patset.matches('a/b.txt'), [])
+        self.assertIsNone(patset.first_match('a/b.txt'))
+        self.assertEqual(len(pathlib.PatternSet([], P)), 0)
+        self.assertRaises(ValueError, pathlib.PatternSet, ['a', ''], P)
+
+    def test_full_match_common(self):
+        P = self.cls
+        # Simple relative pattern.
+        self.assertTrue(P('b.py').full_match('b.py'))
+        self.assertTrue(P('b.py').full_match('*.py'))
+        self.assertFalse(P('a/b.py').full_match('*.py'))
+        self.assertFalse(P('/a/b.py').full_match('b.py'))
+        # Absolute pattern.
+        self.assertTrue(P('/a/b.py').full_match('/a/*.py'))
+        self.assertFalse(P('a/b.py').full_match('/a/*.py'))
+        self.assertFalse(P('/a/b.py').full_match('a/*.py'))
+        # Wildcards don't cross separators.
+        self.assertFalse(P('a/b').full_match('a*b'))
+        self.assertFalse(P('a/b').full_match('a?b'))
+        self.assertFalse(P('a/b').full_match('a[!x]b'))
+        self.assertTrue(P('ayb').full_match('a[!x]b'))
+        # Recursive wildcards.
+        self.assertTrue(P('src/test_a.py').full_match('src/**/test_*.py'))
+        self.assertTrue(P('src/x/y/test_a.py').full_match('src/**/test_*.py'))
+        self.assertFalse(P('x/src/test_a.py').full_match('src/**/test_*.py'))
+        self.assertTrue(P('a').full_match('a/**'))
+        self.assertTrue(P('a/b/c').full_match('a/**'))
+        self.assertFalse(P('ab').full_match('a/**'))
+        self.assertTrue(P('x/y/b').full_match('**/b'))
+        self.assertFalse(P('xb').full_match('**/b'))
+        self.assertTrue(P('a/b').full_match('a/**/**/b'))
+        self.assertTrue(P().full_match('**'))
+        self.assertTrue(P('/a/b').full_match('/**'))
+        self.assertFalse(P('/a/b').full_match('**'))
+        self.assertRaises(ValueError, P('a').full_match, '')
+        pat = pathlib.PathPattern('a/**/*.py', P, full=True)
+        self.assertTrue(pat.full)
+        self.assertEqual(list(pat.filter(['a/b.py', 'b.py', 'a/b/c.py'])),
+                         ['a/b.py', 'a/b/c.py'])
+
+    def test_full_match_sets_common(self):
+        P = self.cls
+        # Sets are translated like fnmatch does, including invalid ranges
+        # and characters with a special meaning in regular expressions.
+        patterns = ['[z-a]x', '[a-*]b', '[!z-a]x', '[a-b-c]x', '[[]x', '[]]x',
+                    '[!]]x', '[~~~]x', '[a&&b]x', '[a||b]x', '[a-]x',
+                    '[!-]x', '[^a]x', '[a-a]x', '[z-ab]x', '[a-z-]x']
+        names = ['ax', 'bx', 'bb', '*b', 'zx', '[x', ']x', '~x', '&x', '|x',
+                 '-x', '^x', 'cx', 'xx']
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertFalse(P('bx').full_match('[z-a]x'))
+            self.assertFalse(P('bb').full_match('[a-*]b'))
+            self.assertTrue(P('bx').full_match('[!z-a]x'))
+            self.assertTrue(P('[x').full_match('[[]x'))
+            self.assertTrue(P('~x').full_match('[~~~]x'))
+            self.assertTrue(P('|x').full_match('[a||b]x'))
+            if sys.version_info < (3, 9):
+                # Older versions of fnmatch raise re.error on these.
+                return
+            for pat in patterns:
+                for name in names:
+                    with self.subTest(pattern=pat, name=name):
+                        self.assertEqual(P(name).full_match(pat),
+                                         fnmatch.fnmatchcase(name, pat))
+
     def test_pickling_common(self):
         P = self.cls
         p = P('/a/b')
@@ -1280,6 +1640,110 @@ class PureWindowsPathTest(_BasePurePathTest, unittest.TestCase):
         self.assertEqual(p / 'c:x/y', P('C:/a/b/x/y'))
         self.assertEqual(p / 'c:/x/y', P('C:/x/y'))
 
+    def test_intern(self):
+        P = self.cls
+        p = P('C:/A/b').intern()
+        self.assertIs(P('c:/a/B').intern(), p)
+
+    def test_child_path(self):
+        P = self.cls
+        for base in ['c:', 'c:/', '//host/share', '//?/c:', 'ab:']:
+            child = P(base) / 'x'
+            self.assertEqual(str(child), str(P(base, 'x')))
+            self.assertEqual(child.parts, P(base, 'x').parts)
+            self.assertEqual(child.drive, P(base).drive)
+
+    def test_relative_to_many(self):
+        P = self.cls
+        self.assertEqual(list(P('C:/Foo').relative_to_many(
+                             ['c:/foo/Bar', 'C:/FOO'])),
+                         [P('Bar'), P()])
+        self.assertEqual(list(P('c:').relative_to_many(['c:/a', 'c:b'])),
+                         [P('/a'), P('b')])
+        self.assertEqual(list(P('//Server/Share').relative_to_many(
+                             ['//sErver/sHare/Foo'])),
+                         [P('Foo')])
+        with self.assertRaises(ValueError):
+            list(P('c:').relative_to_many(['d:/a']))
+        with self.assertRaises(ValueError):
+            list(P('/').relative_to_many(['c:/a']))
+
+    def test_common_ancestor(self):
+        P = self.cls
+        self.assertEqual(str(P.common_ancestor('C:/Foo/Bar', 'c:/foo/baz')),
+                         'C:\\Foo')
+        self.assertEqual(P.common_ancestor('c:a', 'c:b'), P('c:'))
+        self.assertEqual(P.common_ancestor('//h/s/a', '//H/S/b'),
+                         P('//h/s/'))
+        self.assertRaises(ValueError, P.common_ancestor, 'c:/a', 'd:/a')
+        self.assertRaises(ValueError, P.common_ancestor, 'c:a', 'c:/a')
+        self.assertRaises(ValueError, P.common_ancestor, 'a', 'c:a')
+
+    def test_path_pattern(self):
+        P = self.cls
+        pat = pathlib.PathPattern('*.PY', P)
+        self.assertTrue(pat.match('C:/A/b.py'))
+        self.assertTrue(pat.match(P('b.Py')))
+        self.assertFalse(pat.match('b.pyc'))
+        pat = pathlib.PathPattern('c:/*/Test_*', P)
+        self.assertTrue(pat.match('C:/foo/test_x'))
+        self.assertFalse(pat.match('d:/foo/test_x'))
+        self.assertFalse(pat.match('c:foo/test_x'))
+        self.assertFalse(pat.match('c:/foo/bar/test_x'))
+
+    def test_pattern_set(self):
+        P = self.cls
+        patset = pathlib.PatternSet(['*.PY', 'c:/*/Test_*', 'c:', 'Foo'], P)
+        self.assertEqual(patset.matches('C:/x/test_A.py'), [0, 1])
+        self.assertEqual(patset.matches('d:/x/FOO'), [3])
+        self.assertEqual(patset.first_match('C:'), 2)
+        self.assertEqual(patset.first_match('c:foo'), 3)
+
+    def test_full_match(self):
+        P = self.cls
+        self.assertTrue(P('c:/X/y/A.py').full_match('C:/**/*.PY'))
+        self.assertTrue(P('C:a').full_match('c:*'))
+        self.assertFalse(P('c:a').full_match('*'))
+        self.assertFalse(P('c:/x').full_match('**'))
+        self.assertTrue(P('//H/S/x').full_match('//h/s/**'))
+        self.assertTrue(P('A/b').full_match('a\\**'))
+
+    def test_path_trie(self):
+        P = self.cls
+        trie = pathlib.PathTrie(['C:/Users/Foo', '//host/share/x'], P)
+        self.assertIn('c:/users/FOO', trie)
+        self.assertEqual(trie.longest_prefix('c:/USERS/foo/bar'),
+                         P('C:/Users/Foo'))
+        self.assertIsNone(trie.longest_prefix('c:users/foo/bar'))
+        self.assertEqual(trie.longest_prefix('//HOST/Share/x/y'),
+                         P('//host/share/x'))
+        # The set operators keep the path class, and so its case folding.
+        trie = pathlib.PathTrie(['C:/A'], P)
+        for other in (trie | ['c:/a', 'D:/x'], trie & ['c:/a'],
+                      trie - ['D:/x'], trie ^ ['D:/x']):
+            self.assertIsInstance(other, pathlib.PathTrie)
+            self.assertIn('c:/A', other)
+        self.assertEqual(len(trie | ['c:/a', 'D:/x']), 2)
+        self.assertEqual(list(trie | ['c:/a']), [P('C:/A')])
+
+    def test_path_array(self):
+        P = self.cls
+        strings = ['c:', 'c:/', 'C:/A/b.TXT', 'c:a', '//host/share',
+                   '//host/share/x', '//host/share//x', '/x/y', 'x']
+        expected = [P(s) for s in strings]
+        self.assertEqual(str(expected[6]), '\\\\host\\share\\x')
+        arr = pathlib.PathArray(strings, P)
+        self.assertEqual(list(arr), expected)
+        self.assertEqual([str(p) for p in arr], [str(p) for p in expected])
+        self.assertEqual([str(p) for p in P.from_strings(strings)],
+                         [str(p) for p in expected])
+        self.assertEqual(arr.name, [p.name for p in expected])
+        self.assertEqual(list(arr.parent), [p.parent for p in expected])
+        for pattern in ['*.txt', 'c:*', 'c:/*/*', '/x/*', '//host/share/*',
+                        'B.txt', '*']:
+            self.assertEqual(arr.match(pattern),
+                             [p.match(pattern) for p in expected])
+
     def test_is_reserved(self):
         P = self.cls
         self.assertIs(False, P('').is_reserved())
@@ -1635,6 +2099,33 @@ class _BasePathTest:
         self.assertIn(cm.exception.errno, (errno.ENOTDIR,
                                            errno.ENOENT, errno.EINVAL))
 
+    def test_iterdir_keep_entries(self):
+        P = self.cls
+        p = P(BASE)
+        paths = list(p.iterdir(keep_entries=True))
+        self.assertEqual(set(paths), set(p.iterdir()))
+        for q in paths:
+            fresh = P(str(q))
+            for method in ("exists", "is_dir", "is_file", "is_symlink"):
+                self.assertEqual(getattr(q, method)(),
+                                 getattr(fresh, method)(), (q, method))
+            if fresh.exists():
+                self.assertEqual(q.stat(), fresh.stat())
+            self.assertEqual(q.lstat().st_mode, fresh.lstat().st_mode)
+        # Paths with entries aren't all the same file.
+        names = [q.name for q in paths]
+        q = paths[names.index("fileA")]
+        self.assertTrue(q.samefile(paths[names.index("fileA")]))
+        self.assertFalse(q.samefile(paths[names.index("dirA")]))
+        self.assertFalse(q.samefile(P(BASE, "dirB")))
+        # The information is cached by the entries.
+        q.unlink()
+        self.assertFalse(P(BASE, "fileA").exists())
+        self.assertTrue(q.exists())
+        self.assertTrue(q.is_file())
+        # Derived paths don't keep the entry.
+        self.assertFalse((q / "..").exists())
+
     def test_glob_common(self):
         def _check(glob, expected):
             self.assertEqual(set(glob), { P(BASE, q) for q in expected })
@@ -1680,6 +2171,237 @@ class _BasePathTest:
         _check(p.rglob("file*"), ["dirC/fileC", "dirC/dirD/fileD"])
         _check(p.rglob("*/*"), ["dirC/dirD/fileD"])
 
+    def test_glob_recursive_common(self):
+        def _check(glob, expected):
+            self.assertEqual(sorted(glob), sorted(P(BASE, q) for q in expected))
+        P = self.cls
+        p = P(BASE)
+        _check(p.glob("dirC/**"), ["dirC", "dirC/dirD"])
+        _check(p.glob("**/dirD/*"), ["dirC/dirD/fileD"])
+        _check(p.glob("**/dirC/**/file*"), ["dirC/fileC", "dirC/dirD/fileD"])
+        _check(p.glob("dirC/**/**/fileD"), ["dirC/dirD/fileD"])
+        _check(p.glob("dirC/**/dirD/**"), ["dirC/dirD"])
+        _check(p.glob("fileA/**"), [])
+        _check(p.glob("**/fileA/*"), [])
+        # Each path is yielded once.
+        _check(p.rglob("file*"), ["fileA", "dirB/fileB", "dirC/fileC",
+                                  "dirC/dirD/fileD"])
+        _check(p.rglob("dirC/**"), ["dirC", "dirC/dirD"])
+        _check(p.glob("**/**/dirD"), ["dirC/dirD"])
+
+    def test_glob_literal_prefix_common(self):
+        def _check(glob, expected):
+            self.assertEqual(sorted(glob), sorted(P(BASE, q) for q in expected))
+        P = self.cls
+        p = P(BASE)
+        _check(p.glob("dirC/dirD/fileD"), ["dirC/dirD/fileD"])
+        _check(p.glob("dirC/dirD/*"), ["dirC/dirD/fileD"])
+        _check(p.glob("dirC/dirD/fileD/x"), [])
+        _check(p.glob("dirC/nope/*"), [])
+        _check(p.glob("fileA/dirD/*"), [])
+        _check(P(BASE, "fileA").glob("x"), [])
+        _check(P(BASE, "nope").glob("x/y"), [])
+
+    def test_glob_stream_common(self):
+        P = self.cls
+        p = P(BASE)
+        patterns = ["*", "*/*", "dir*/file*", "**", "**/*", "**/file*",
+                    "dirC/**", "dirC/dirD/fileD", "*/nope"]
+        with mock.patch.object(pathlib, '_STREAM_BATCH_SIZE', 2):
+            for pattern in patterns:
+                self.assertEqual(sorted(p.glob(pattern, stream=True)),
+                                 sorted(p.glob(pattern)), pattern)
+                self.assertEqual(sorted(p.rglob(pattern, stream=True)),
+                                 sorted(p.rglob(pattern)), pattern)
+        it = p.glob("*", stream=True)
+        self.assertIsInstance(it, collections.abc.Iterator)
+        self.assertIn(next(it).name, os.listdir(BASE))
+        it.close()
+
+    def test_glob_breadth_first_common(self):
+        P = self.cls
+        p = P(BASE)
+        for pattern in ["*", "**", "*/*", "**/file*"]:
+            given = list(p.rglob(pattern, breadth_first=True))
+            self.assertEqual(sorted(given), sorted(p.rglob(pattern)))
+            depths = [len(q.parts) for q in given]
+            self.assertEqual(depths, sorted(depths), pattern)
+        given = list(p.glob("**", breadth_first=True))
+        self.assertEqual(given[0], p)
+        self.assertEqual(sorted(given), sorted(p.glob("**")))
+
+    def test_glob_workers_common(self):
+        P = self.cls
+        p = P(BASE)
+        for pattern in ["*", "**", "*/*", "**/file*", "dirC/**",
+                        "dirC/dirD/fileD"]:
+            expected = list(p.glob(pattern))
+            self.assertEqual(sorted(p.glob(pattern, workers=3)),
+                             sorted(expected), pattern)
+            self.assertEqual(list(p.glob(pattern, workers=3, ordered=True)),
+                             expected, pattern)
+            expected = list(p.rglob(pattern, breadth_first=True))
+            self.assertEqual(list(p.rglob(pattern, breadth_first=True,
+                                          workers=2, ordered=True)),
+                             expected, pattern)
+        it = p.rglob("*", workers=2)
+        next(it)
+        it.close()
+        with self.assertRaises(ValueError):
+            list(p.glob("*", stream=True, workers=2))
+
+    def test_glob_many_common(self):
+        P = self.cls
+        p = P(BASE)
+        patterns = ["*", "dirC/**", "**/file*", "dirB/fileB", "dir*/*",
+                    "*/*/fileD", "nope/*"]
+        expected = sorted((i, q) for i, pattern in enumerate(patterns)
+                          for q in p.glob(pattern))
+        self.assertEqual(sorted(p.glob_many(patterns)), expected)
+        self.assertEqual(sorted(p.glob_many(iter(patterns),
+                                            breadth_first=True)), expected)
+        self.assertEqual(sorted(p.glob_many(patterns, workers=2)), expected)
+        self.assertEqual(list(p.glob_many(["fileA", "fileA"])),
+                         [(0, p / "fileA"), (1, p / "fileA")])
+        self.assertEqual(list(p.glob_many([])), [])
+        with self.assertRaises(ValueError):
+            list(p.glob_many(["*", ""]))
+        with self.assertRaises(NotImplementedError):
+            list(p.glob_many(["*", "/*"]))
+
+    def test_glob_exclude_common(self):
+        P = self.cls
+        p = P(BASE)
+        def _check(glob, expected):
+            self.assertEqual(set(glob), {P(BASE, q) for q in expected})
+        _check(p.glob("dirC/**", exclude="dirD"), ["dirC"])
+        _check(p.rglob("file*", exclude=["dirB", "dirC"]), ["fileA"])
+        _check(p.rglob("file*", exclude="dirC/*"), ["fileA", "dirB/fileB"])
+        _check(p.glob("dir*/file*", exclude=lambda q: q.name == "dirB"),
+               ["dirC/fileC"])
+        _check(p.glob("dirC/dirD/fileD", exclude="fileD"), [])
+        # Directories within runs of literal names are excluded too.
+        _check(p.glob("dirC/dirD/fileD", exclude="dirD"), [])
+        _check(p.glob("dirC/dirD/*", exclude="dirC"), [])
+        _check(p.glob("dirC/dirD/*", exclude="dirC/*"), [])
+        _check(p.glob("dirC/dirD/*", exclude="fileC"), ["dirC/dirD/fileD"])
+        self.assertEqual(sorted(p.glob_many(["dirC/*", "dirB/fileB"],
+                                            exclude="dirD")),
+                         [(0, P(BASE, "dirC/fileC")),
+                          (1, P(BASE, "dirB/fileB"))])
+        # The root itself is never excluded.
+        _check(p.glob("**", exclude=[p.name, "dir*"]), [""])
+        # Excluded directories are not scanned.
+        scanned = []
+        scandir = P._scandir
+        def _scandir(path):
+            scanned.append(path)
+            return scandir(path)
+        with mock.patch.object(P, '_scandir', _scandir):
+            list(p.rglob("*", exclude=["dirA", "dirB", "dirC", "dirE"]))
+            list(p.rglob("*", exclude="dirC", stream=True))
+            list(p.rglob("*", exclude="dirC", workers=2))
+        self.assertNotIn(P(BASE, "dirC"), scanned)
+        self.assertNotIn(P(BASE, "dirC", "dirD"), scanned)
+
+    def test_glob_max_depth_common(self):
+        P = self.cls
+        p = P(BASE)
+        def _check(glob, expected):
+            self.assertEqual(set(glob), {P(BASE, q) for q in expected})
+        _check(p.glob("**", max_depth=0), [""])
+        _check(p.rglob("*", max_depth=0), [])
+        _check(p.rglob("file*", max_depth=1), ["fileA"])
+        _check(p.rglob("file*", max_depth=2), ["fileA", "dirB/fileB",
+                                               "dirC/fileC"])
+        _check(p.glob("dirC/**", max_depth=1), ["dirC"])
+        _check(p.glob("dirC/dirD/fileD", max_depth=2), [])
+        _check(p.glob("dirC/dirD/fileD", max_depth=3), ["dirC/dirD/fileD"])
+        for pattern in ["*", "**", "**/*", "*/*", "**/file*"]:
+            for depth in range(4):
+                expected = [q for q in p.glob(pattern)
+                            if len(q.relative_to(p).parts) <= depth]
+                self.assertEqual(sorted(p.glob(pattern, max_depth=depth)),
+                                 sorted(expected), (pattern, depth))
+                self.assertEqual(
+                    sorted(p.glob(pattern, max_depth=depth, workers=2)),
+                    sorted(expected), (pattern, depth))
+        self.assertEqual(sorted(p.glob_many(["*", "**/fileC"], max_depth=1)),
+                         sorted((0, q) for q in p.glob("*")))
+        with self.assertRaises(ValueError):
+            list(p.glob("*", max_depth=-1))
+
+    def test_glob_limit_common(self):
+        P = self.cls
+        p = P(BASE)
+        for pattern in ["*", "**", "**/file*", "dirC/*"]:
+            expected = list(p.rglob(pattern))
+            for limit in range(4):
+                self.assertEqual(list(p.rglob(pattern, limit=limit)),
+                                 expected[:limit], (pattern, limit))
+                given = list(p.rglob(pattern, limit=limit, workers=2))
+                self.assertEqual(len(given), min(limit, len(expected)))
+                self.assertLessEqual(set(given), set(expected))
+        self.assertEqual(len(list(p.glob_many(["*", "**"], limit=3))), 3)
+        with self.assertRaises(ValueError):
+            list(p.glob("*", limit=-1))
+        # The walk stops as soon as the limit is reached.
+        scanned = []
+        scandir = P._scandir
+        def _scandir(path):
+            scanned.append(path)
+            return scandir(path)
+        with mock.patch.object(pathlib, '_STREAM_BATCH_SIZE', 1), \
+                mock.patch.object(P, '_scandir', _scandir):
+            self.assertEqual(len(list(p.rglob("*", limit=1))), 1)
+        self.assertEqual(scanned, [p])
+
+    def test_glob_any_common(self):
+        P = self.cls
+        p = P(BASE)
+        self.assertIs(p.glob_any("**/fileD"), True)
+        self.assertIs(p.glob_any("*/nope"), False)
+        self.assertIs(p.glob_any("**/fileD", max_depth=2), False)
+        self.assertIs(p.glob_any("**/fileD", exclude="dirC"), False)
+        self.assertIs(P(BASE, "nope").glob_any("*"), False)
+
+    def test_glob_braces_common(self):
+        P = self.cls
+        p = P(BASE)
+        def _check(glob, expected):
+            self.assertEqual(set(glob), {P(BASE, q) for q in expected})
+        _check(p.glob("dir{A,B}"), ["dirA", "dirB"])
+        _check(p.glob("dir{A,{C,E}}"), ["dirA", "dirC", "dirE"])
+        _check(p.glob("{dirB,dirC}/file{B,C}"), ["dirB/fileB", "dirC/fileC"])
+        _check(p.glob("*/file{C,D}"), ["dirC/fileC"])
+        _check(p.rglob("file{A,C,D}"), ["fileA", "dirC/fileC",
+                                         "dirC/dirD/fileD"])
+        _check(p.glob("{dirA,dirE}/**"), ["dirA", "dirE"])
+        # Braces without alternatives are taken literally.
+        _check(p.glob("dir{A}"), [])
+        _check(p.glob("dir{A,B"), [])
+        _check(p.glob("dir[{]A,B}"), [])
+        # Groups are not expanded into every combination of alternatives.
+        _check(p.glob("dir{A,B}" + "{,}" * 40), ["dirA", "dirB"])
+
+    def test_glob_keep_entries_common(self):
+        P = self.cls
+        p = P(BASE)
+        for pattern in ["*", "**", "**/file*", "dirC/*"]:
+            paths = list(p.rglob(pattern, keep_entries=True))
+            self.assertEqual(paths, list(p.rglob(pattern)))
+            for q in paths:
+                fresh = P(str(q))
+                self.assertEqual(q.is_dir(), fresh.is_dir(), q)
+                self.assertEqual(q.is_file(), fresh.is_file(), q)
+                self.assertEqual(q.is_symlink(), fresh.is_symlink(), q)
+        q, = p.glob("dirC/fileC", keep_entries=True)
+        self.assertIsNone(q._dir_entry)
+        q, = p.glob("dirC/file*", keep_entries=True)
+        self.assertEqual(q._dir_entry.name, "fileC")
+        q, = p.glob_many(["d*C/f*C"], keep_entries=True, workers=2)
+        self.assertEqual(q[1]._dir_entry.name, "fileC")
+
     @os_helper.skip_unless_symlink
     def test_rglob_symlink_loop(self):
         # Don't get fooled by symlink loops (Issue #26012).
@@ -2466,8 +3188,16 @@ class PathTest(_BasePathTest, unittest.TestCase):
     def test_unsupported_flavour(self):
         if os.name == 'nt':
             self.assertRaises(NotImplementedError, pathlib.PosixPath)
+            self.assertRaises(NotImplementedError,
+                              pathlib.PosixPath.from_strings, [])
         else:
             self.assertRaises(NotImplementedError, pathlib.WindowsPath)
+            self.assertRaises(NotImplementedError,
+                              pathlib.WindowsPath.from_strings, [])
+
+    def test_from_strings_concrete_class(self):
+        p, = self.cls.from_strings(['a'])
+        self.assertIs(type(p), type(self.cls('a')))
 
     def test_glob_empty_pattern(self):
         p = self.cls()